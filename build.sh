@@ -1 +1 @@
-python3 src/main.py "/ssg/"
+python3 src/build_client.py "/ssg/" "$@"
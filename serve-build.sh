@@ -0,0 +1 @@
+python3 src/serve_build.py
@@ -0,0 +1,133 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from copystatic import place_file
+from manifest import hash_file
+from statefile import load_state, save_state
+
+ASSET_MANIFEST_VERSION = 1
+HASH_LENGTH = 10
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def fingerprinted_name(name, content_hash):
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{content_hash[:HASH_LENGTH]}{extension}"
+
+
+class AssetManifest:
+    def __init__(self, path, assets=None) -> None:
+        self.path = path
+        # root-relative URL -> fingerprinted root-relative URL
+        self.assets = assets if assets is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        data = load_state(path, ASSET_MANIFEST_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("assets", {}))
+
+    def url(self, value):
+        path, separator, rest = value.partition("?")
+        if not separator:
+            path, separator, rest = value.partition("#")
+        fingerprinted = self.assets.get(path)
+        if fingerprinted is None:
+            return value
+        return fingerprinted + separator + rest
+
+    def signature(self, urls):
+        # Digest of where the given URLs point, so cached output that embeds
+        # them goes stale when one of those assets changes.
+        digest = hashlib.blake2b(digest_size=16)
+        for url in urls:
+            digest.update(f"{url}\0{self.url(url)}\0".encode())
+        return digest.hexdigest()
+
+    def headers(self, context):
+        # Netlify/Cloudflare Pages "_headers" rules: fingerprinted names never
+        # change content, so clients may cache them for good.
+        lines = []
+        for url in sorted(self.assets.values()):
+            lines.append(context.basepath + url[1:])
+            lines.append(f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def save(self):
+        save_state(
+            self.path,
+            {"version": ASSET_MANIFEST_VERSION, "assets": self.assets},
+            indent=1,
+            sort_keys=True,
+        )
+
+    def __repr__(self):
+        # Part of RenderContext.cache_key; the fingerprints themselves are
+        # keyed per block and per page through signature().
+        return "AssetManifest()"
+
+
+def fingerprint_static_files(
+    source_dir_path, dest_dir_path, manifest, assets, strategy="copy", jobs=None
+):
+    # Runs after sync_static_files, whose manifest entries already hold each
+    # file's content hash, so nothing is hashed twice.
+    pending = []
+    fingerprints = {}
+    scan_assets(source_dir_path, dest_dir_path, "/", manifest, pending, fingerprints)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(place_file, from_path, dest_path, strategy)
+            for from_path, dest_path in pending
+        ]
+    for future in futures:
+        future.result()
+    assets.assets = fingerprints
+    print(
+        f" * {len(pending)} fingerprinted assets updated, "
+        f"{len(fingerprints) - len(pending)} unchanged"
+    )
+    return [dest_path for _, dest_path in pending]
+
+
+def fingerprint_static_file(from_path, dest_dir_path, url, assets, strategy="copy"):
+    # One asset changed outside a full scan, e.g. in watch mode: publish it
+    # under its new name, point its URL there and drop the previous copy.
+    name = fingerprinted_name(os.path.basename(from_path), hash_file(from_path))
+    dest_path = os.path.join(dest_dir_path, name)
+    place_file(from_path, dest_path, strategy)
+    previous = assets.assets.get(url)
+    assets.assets[url] = url[: url.rindex("/") + 1] + name
+    if previous is not None and previous != assets.assets[url]:
+        remove_asset(os.path.join(dest_dir_path, previous.rsplit("/", 1)[1]))
+    return dest_path
+
+
+def remove_asset(dest_path):
+    if os.path.exists(dest_path):
+        print(f" - removing {dest_path}")
+        os.remove(dest_path)
+
+
+def scan_assets(source_dir_path, dest_dir_path, url_prefix, manifest, pending, assets):
+    with os.scandir(source_dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                scan_assets(
+                    entry.path,
+                    os.path.join(dest_dir_path, entry.name),
+                    f"{url_prefix}{entry.name}/",
+                    manifest,
+                    pending,
+                    assets,
+                )
+                continue
+            key = manifest.outputs[os.path.join(dest_dir_path, entry.name)]
+            name = fingerprinted_name(entry.name, key["source"])
+            dest_path = os.path.join(dest_dir_path, name)
+            if not manifest.is_fresh(dest_path, key):
+                pending.append((entry.path, dest_path))
+            manifest.record(dest_path, key)
+            assets[url_prefix + entry.name] = url_prefix + name
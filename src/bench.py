@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from block_lexer import BlockType, lex_markdown
+from blocks import typed_block_to_html_node
+from document import page_values
+from htmlnode import RenderContext, text_node_to_html_node
+from inline_markdown import text_to_textnodes
+from template import compile_template
+
+STAGES = (
+    "lex_blocks",
+    "text_to_textnodes",
+    "block_to_html_node",
+    "to_html",
+    "template_fill",
+    "file_io",
+)
+DEFAULT_MIX = {
+    "heading": 1,
+    "paragraph": 4,
+    "links": 2,
+    "ulist": 2,
+    "olist": 1,
+    "quote": 1,
+    "code": 1,
+}
+BENCH_TEMPLATE = """<!doctype html>
+<html>
+<head>
+  <title>{{ Title }}</title>
+  <link href="/index.css" rel="stylesheet" />
+</head>
+<body>
+  <article>{{ Content }}</article>
+</body>
+</html>
+"""
+WORDS = (
+    "the quick brown fox jumps over lazy dog middle earth ring fellowship "
+    "shire river mountain wizard elf dwarf hobbit road song tale"
+).split()
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_block(kind, rng, i):
+    if kind == "heading":
+        return f"{'#' * rng.randint(2, 4)} {sentence(rng, 4).title()} {i}"
+    if kind == "paragraph":
+        return (
+            f"{sentence(rng, 12)} **{sentence(rng, 2)}** {sentence(rng, 8)}"
+            f" _{sentence(rng, 2)}_ and `code {i}` {sentence(rng, 10)}."
+        )
+    if kind == "links":
+        return " ".join(
+            f"{sentence(rng, 3)} [{sentence(rng, 2)}](/docs/{i}/{j})"
+            + (f" ![img {j}](/images/{j}.png)" if j % 5 == 0 else "")
+            for j in range(20)
+        )
+    if kind == "ulist":
+        return "\n".join(f"- {sentence(rng, 6)}" for _ in range(rng.randint(3, 8)))
+    if kind == "olist":
+        items = rng.randint(3, 8)
+        return "\n".join(f"{n}. {sentence(rng, 6)}" for n in range(1, items + 1))
+    if kind == "quote":
+        return "\n".join(f"> {sentence(rng, 10)}" for _ in range(rng.randint(1, 4)))
+    if kind == "code":
+        lines = [f"def f{i}_{n}(x):  # {sentence(rng, 3)}" for n in range(5)]
+        return "```\n" + "\n".join(lines) + "\n```"
+    raise ValueError(f"invalid block kind: {kind}")
+
+
+def generate_page_markdown(rng, page, blocks, mix):
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    parts = [f"# Page {page}"]
+    for i in range(blocks):
+        parts.append(make_block(rng.choices(kinds, weights)[0], rng, i))
+    return "\n\n".join(parts) + "\n"
+
+
+def generate_corpus(pages, blocks, mix=None, seed=0):
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    return [generate_page_markdown(rng, page, blocks, mix) for page in range(pages)]
+
+
+def write_corpus(corpus, dir_path):
+    for page, markdown in enumerate(corpus):
+        page_dir = os.path.join(dir_path, f"page{page}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), "w") as file:
+            file.write(markdown)
+
+
+def inline_texts(block):
+    if block.block_type == BlockType.HEADING:
+        return [block.text.lstrip("#").strip()]
+    return block.items
+
+
+def run_once(corpus, out_dir):
+    timings = dict.fromkeys(STAGES, 0.0)
+    template = compile_template(BENCH_TEMPLATE)
+    context = RenderContext("/")
+    clock = time.perf_counter
+    for page, markdown in enumerate(corpus):
+        start = clock()
+        blocks = list(lex_markdown(markdown))
+        timings["lex_blocks"] += clock() - start
+
+        texts = [text for block in blocks for text in inline_texts(block)]
+        start = clock()
+        tokenized = {text: text_to_textnodes(text) for text in texts}
+        timings["text_to_textnodes"] += clock() - start
+
+        # Builds the nodes from the TextNodes above, so tokenizing isn't
+        # timed twice.
+        def to_children(text):
+            return [text_node_to_html_node(node) for node in tokenized[text]]
+
+        start = clock()
+        nodes = [typed_block_to_html_node(block, to_children) for block in blocks]
+        timings["block_to_html_node"] += clock() - start
+
+        start = clock()
+        content = "".join(node.to_html() for node in nodes)
+        timings["to_html"] += clock() - start
+
+        start = clock()
+        html = template.render(page_values(f"Page {page}", content, context))
+        timings["template_fill"] += clock() - start
+
+        start = clock()
+        path = os.path.join(out_dir, f"page{page}.html")
+        with open(path, "w") as file:
+            file.write(html)
+        with open(path, "r") as file:
+            file.read()
+        timings["file_io"] += clock() - start
+    return timings
+
+
+def run_benchmark(corpus, repeat):
+    best = dict.fromkeys(STAGES, float("inf"))
+    with tempfile.TemporaryDirectory() as out_dir:
+        for _ in range(repeat):
+            for stage, seconds in run_once(corpus, out_dir).items():
+                best[stage] = min(best[stage], seconds)
+    return best
+
+
+def compare_results(results, baseline, threshold):
+    regressions = []
+    for stage, seconds in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous is None or previous["seconds"] <= 0:
+            continue
+        ratio = seconds["seconds"] / previous["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append((stage, ratio))
+    return regressions
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"invalid block kind: {kind}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="bench.py")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=50, help="blocks per page")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="block weights, e.g. heading=1,paragraph=4,links=2,code=1",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write machine-readable results here")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed slowdown per stage before failing (0.10 = 10%%)",
+    )
+    parser.add_argument("--write-corpus", help="also write the corpus as content")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    corpus = generate_corpus(args.pages, args.blocks, args.mix, args.seed)
+    if args.write_corpus:
+        write_corpus(corpus, args.write_corpus)
+
+    stages = run_benchmark(corpus, args.repeat)
+    total = sum(stages.values())
+    results = {
+        "config": {
+            "pages": args.pages,
+            "blocks": args.blocks,
+            "mix": args.mix,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "bytes": sum(len(markdown) for markdown in corpus),
+        },
+        "python": platform.python_version(),
+        "stages": {
+            stage: {
+                "seconds": seconds,
+                "per_page_us": seconds / args.pages * 1e6,
+                "share": seconds / total if total else 0.0,
+            }
+            for stage, seconds in stages.items()
+        },
+        "total_seconds": total,
+    }
+
+    for stage, result in results["stages"].items():
+        print(
+            f"{stage:>20} {result['seconds']:>9.4f}s"
+            f" {result['per_page_us']:>10.1f}us/page {result['share']:>6.1%}"
+        )
+    print(f"{'total':>20} {total:>9.4f}s")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = compare_results(results, baseline, args.threshold)
+        for stage, ratio in regressions:
+            print(f"REGRESSION {stage}: {ratio:.2f}x baseline")
+        if regressions:
+            sys.exit(1)
+        print(f"No stage slower than {1 + args.threshold:.2f}x baseline")
+
+
+if __name__ == "__main__":
+    main()
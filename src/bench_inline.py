@@ -0,0 +1,62 @@
+import sys
+import timeit
+
+from inline_markdown import (split_nodes_delimiter, split_nodes_image,
+                             split_nodes_link, text_to_textnodes)
+from textnode import TextNode, TextType
+
+
+def chained_text_to_textnodes(text):
+    # The previous five-pass pipeline, kept here as the comparison baseline.
+    node = TextNode(text, TextType.TEXT)
+    new_nodes = split_nodes_delimiter([node], "**", TextType.BOLD)
+    new_nodes = split_nodes_delimiter(new_nodes, "_", TextType.ITALIC)
+    new_nodes = split_nodes_delimiter(new_nodes, "`", TextType.CODE)
+    new_nodes = split_nodes_image(new_nodes)
+    new_nodes = split_nodes_link(new_nodes)
+    return new_nodes
+
+
+def link_paragraph(links):
+    return " ".join(
+        f"see [link {i}](https://example.com/{i}) and ![image {i}](/images/{i}.png)"
+        for i in range(links)
+    )
+
+
+def mixed_paragraph(links):
+    return " ".join(
+        f"See [link {i}](https://example.com/{i}) with **bold {i}** and `code {i}`."
+        for i in range(links)
+    )
+
+
+PARAGRAPHS = {"links": link_paragraph, "mixed": mixed_paragraph}
+
+
+def best_time(function, text, repeat):
+    return min(timeit.repeat(lambda: function(text), number=1, repeat=repeat))
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 2000, 5000]
+    print(
+        f"{'shape':>6} {'links':>6} {'chars':>9}"
+        f" {'chained (s)':>12} {'single (s)':>11} {'speedup':>8}"
+    )
+    for shape, make_paragraph in PARAGRAPHS.items():
+        for links in sizes:
+            text = make_paragraph(links)
+            if chained_text_to_textnodes(text) != text_to_textnodes(text):
+                raise ValueError(f"token streams differ for {shape}/{links}")
+            repeat = 3 if links > 1000 else 10
+            chained = best_time(chained_text_to_textnodes, text, repeat)
+            single = best_time(text_to_textnodes, text, repeat)
+            print(
+                f"{shape:>6} {links:>6} {len(text):>9}"
+                f" {chained:>12.4f} {single:>11.4f} {chained / single:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
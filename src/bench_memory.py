@@ -0,0 +1,46 @@
+import gc
+import resource
+import sys
+
+from blocks import markdown_to_html_node
+
+
+def large_page(blocks):
+    parts = ["# Reference"]
+    for i in range(blocks):
+        parts.append(
+            f"Paragraph {i} with **bold** and _italic_ text, `code`, a"
+            f" [link](/docs/{i}) and ![image](/images/{i}.png) inline."
+        )
+        items = [f"- item {j} with [link](/items/{j})" for j in range(5)]
+        parts.append("\n".join(items))
+    return "\n\n".join(parts)
+
+
+def peak_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    markdown = large_page(blocks)
+
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    blocks_before = sys.getallocatedblocks()
+    rss_before = peak_rss_mib()
+    node = markdown_to_html_node(markdown)
+    gc.collect()
+    objects = len(gc.get_objects()) - objects_before
+    allocated = sys.getallocatedblocks() - blocks_before
+
+    print(f"blocks:          {blocks}")
+    print(f"tracked objects: {objects}")
+    print(f"live blocks:     {allocated}")
+    rss = peak_rss_mib()
+    print(f"peak RSS:        {rss:.1f} MiB (+{rss - rss_before:.1f} MiB)")
+    return node
+
+
+if __name__ == "__main__":
+    main()
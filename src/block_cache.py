@@ -0,0 +1,121 @@
+import hashlib
+
+from blocks import typed_block_to_html_node
+from document import block_facts, facts_size
+from manifest import GENERATOR_VERSION
+from statefile import load_state, save_state
+
+BLOCK_CACHE_VERSION = 3
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def block_key(block, context=None):
+    # Content-addressed: the same block text rendered by the same generator
+    # under the same render options always produces the same fragment.
+    options = context.cache_key() if context is not None else ""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{GENERATOR_VERSION}\0{options}\0".encode())
+    if context is not None:
+        digest.update(context.signature(block.text).encode())
+    digest.update(block.text.encode())
+    return digest.hexdigest()
+
+
+class BlockCache:
+    def __init__(self, path, entries=None, max_bytes=DEFAULT_MAX_BYTES) -> None:
+        self.path = path
+        # key -> [html, facts], ordered least to most recently used.
+        self.entries = entries if entries is not None else {}
+        self.max_bytes = max_bytes
+        self.size = sum(entry_size(key, entry) for key, entry in self.entries.items())
+        self.hits = 0
+        self.misses = 0
+        # What this process used and added, for merging back into the parent.
+        self.touched = []
+        self.added = {}
+
+    @classmethod
+    def load(cls, path, max_bytes=DEFAULT_MAX_BYTES):
+        data = load_state(path, BLOCK_CACHE_VERSION)
+        if data is None:
+            return cls(path, max_bytes=max_bytes)
+        return cls(path, data.get("entries", {}), max_bytes)
+
+    def render(self, block, context=None, node=None):
+        # Returns the block's HTML and the facts (links, images) gathered from
+        # its nodes, so cache hits still feed the site graph. node, when given,
+        # is the block's already built node.
+        key = block_key(block, context)
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.hits += 1
+            self.entries[key] = entry
+            self.touched.append(key)
+            return entry
+        self.misses += 1
+        if node is None:
+            node = typed_block_to_html_node(block)
+        terms = context is not None and context.search
+        entry = [node.to_html(context), block_facts(node, terms)]
+        self.store(key, entry)
+        self.added[key] = entry
+        return entry
+
+    def store(self, key, entry):
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= entry_size(key, previous)
+        self.entries[key] = entry
+        self.size += entry_size(key, entry)
+        # Evict as blocks are rendered, so a build holds at most max_bytes of
+        # cached HTML however large its pages are.
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def drain(self):
+        updates = (self.hits, self.misses, self.touched, self.added)
+        self.hits = 0
+        self.misses = 0
+        self.touched = []
+        self.added = {}
+        return updates
+
+    def merge(self, updates):
+        hits, misses, touched, added = updates
+        self.hits += hits
+        self.misses += misses
+        for key in touched:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.entries[key] = entry
+        for key, entry in added.items():
+            self.store(key, entry)
+
+    def evict(self):
+        evicted = 0
+        while self.size > self.max_bytes and self.entries:
+            key = next(iter(self.entries))
+            self.size -= entry_size(key, self.entries.pop(key))
+            self.added.pop(key, None)
+            evicted += 1
+        return evicted
+
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def print_summary(self):
+        print(
+            f" * block cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_ratio():.1%} hit rate), {len(self.entries)} entries"
+        )
+
+    def save(self):
+        self.evict()
+        # Entry order is the LRU order, so it must survive the round trip.
+        save_state(self.path, {"version": BLOCK_CACHE_VERSION, "entries": self.entries})
+
+
+def entry_size(key, entry):
+    html, facts = entry
+    return len(key) + len(html) + facts_size(facts)
@@ -0,0 +1,154 @@
+import re
+from enum import Enum
+
+CHUNK_SIZE = 1024 * 1024
+FENCE_CLOSE_PATTERN = re.compile(r"```[^\S\n]*$", re.MULTILINE)
+
+
+class BlockType(Enum):
+    PARAGRAPH = "paragraph"
+    HEADING = "heading"
+    CODE = "code"
+    QUOTE = "quote"
+    UNORDERED_LIST = "unordered_list"
+    ORDERED_LIST = "ordered_list"
+
+
+class Block:
+    __slots__ = ("block_type", "text", "items", "start", "end")
+
+    def __init__(self, block_type, text, items, start, end) -> None:
+        self.block_type = block_type
+        self.text = text
+        # The block's inline texts, ready for text_to_textnodes: one per list
+        # item, or a single joined text for paragraphs and quotes.
+        self.items = items
+        # Source line range [start, end) of the block.
+        self.start = start
+        self.end = end
+
+    def __eq__(self, other) -> bool:
+        return (
+            self.block_type == other.block_type
+            and self.text == other.text
+            and self.items == other.items
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Block({self.block_type.value}, {self.text!r}, {self.start}-{self.end})"
+        )
+
+
+def lex_markdown(markdown):
+    return lex_chunks((markdown,))
+
+
+def lex_file(file, chunk_size=CHUNK_SIZE):
+    # Reads lazily, so memory is bounded by the largest block, not the file.
+    return lex_chunks(iter(lambda: file.read(chunk_size), ""))
+
+
+def lex_chunks(chunks):
+    # Blocks are split exactly like markdown.split("\n\n") followed by strip(),
+    # except that blank lines inside an open ``` fence don't end the block. The
+    # markdown may arrive in chunks; only the unfinished tail is buffered.
+    pending = []
+    fence = []
+    fence_start = 0
+    line = 0
+    for chunk in chunks:
+        if "\n\n" not in chunk and not (
+            chunk.startswith("\n") and pending and pending[-1].endswith("\n")
+        ):
+            # No block ends in this chunk; defer the join so a block spanning
+            # many chunks is copied once, not once per chunk.
+            if chunk:
+                pending.append(chunk)
+            continue
+        pending.append(chunk)
+        pieces = "".join(pending).split("\n\n")
+        pending = [pieces.pop()]
+        for piece in pieces:
+            if fence:
+                fence.append(piece)
+                if FENCE_CLOSE_PATTERN.search(piece):
+                    yield finish_block("\n\n".join(fence), fence_start)
+                    fence = []
+            elif opens_fence(piece):
+                fence = [piece]
+                fence_start = line
+            else:
+                yield finish_block(piece, line)
+            line += piece.count("\n") + 2
+
+    pending = "".join(pending)
+    if fence:
+        fence.append(pending)
+        if FENCE_CLOSE_PATTERN.search(pending):
+            yield finish_block("\n\n".join(fence), fence_start)
+            return
+        # An unclosed fence does not swallow the rest of the document.
+        for piece in fence:
+            yield finish_block(piece, fence_start)
+            fence_start += piece.count("\n") + 2
+        return
+    yield finish_block(pending, line)
+
+
+def opens_fence(piece):
+    # A fence opens on ``` plus an optional info string without backticks, and
+    # stays open when no later line of the same piece closes it.
+    text = piece.lstrip()
+    if not text.startswith("```"):
+        return False
+    first, _, rest = text.partition("\n")
+    return "`" not in first[3:] and not FENCE_CLOSE_PATTERN.search(rest)
+
+
+def finish_block(raw, start):
+    text = raw.strip()
+    end = start + raw.count("\n") + 1
+    if text.startswith("```") and text.endswith("```"):
+        return Block(BlockType.CODE, text, [], start, end)
+    if not text:
+        return Block(BlockType.PARAGRAPH, text, [], start, end)
+
+    # Every line of a quote or list starts with the same marker, so the first
+    # character decides which full-line check, if any, is worth running.
+    first = text[0]
+    if first == ">":
+        lines = text.split("\n")
+        if all(line.startswith(">") for line in lines):
+            content = " ".join(line.lstrip(">").strip() for line in lines)
+            return Block(BlockType.QUOTE, text, [content], start, end)
+    elif first == "-":
+        lines = text.split("\n")
+        if all(line.startswith("- ") for line in lines):
+            items = [line[2:] for line in lines]
+            return Block(BlockType.UNORDERED_LIST, text, items, start, end)
+    elif first == "1":
+        lines = text.split("\n")
+        if is_ordered_list(lines):
+            items = [line[3:] for line in lines]
+            return Block(BlockType.ORDERED_LIST, text, items, start, end)
+    elif first == "#":
+        space = text.find(" ")
+        newline = text.find("\n")
+        if 0 < space <= 7 and (newline == -1 or space < newline):
+            return Block(BlockType.HEADING, text, [], start, end)
+    return Block(BlockType.PARAGRAPH, text, [text.replace("\n", " ")], start, end)
+
+
+def is_ordered_list(lines):
+    for index, line in enumerate(lines, start=1):
+        head, separator, _ = line.partition(". ")
+        if not (
+            separator
+            and head.isascii()
+            and head.isdigit()
+            and head[0] != "0"
+            and int(head) == index
+        ):
+            return False
+    return True
@@ -1,19 +1,9 @@
-from enum import Enum
-
+from block_lexer import BlockType, lex_markdown
 from htmlnode import ParentNode, text_node_to_html_node
-from inline_markdown import markdown_to_blocks, text_to_textnodes
+from inline_markdown import text_to_textnodes
 from textnode import TextNode, TextType
 
 
-class BlockType(Enum):
-    PARAGRAPH = "paragraph"
-    HEADING = "heading"
-    CODE = "code"
-    QUOTE = "quote"
-    UNORDERED_LIST = "unordered_list"
-    ORDERED_LIST = "ordered_list"
-
-
 def block_to_block_type(block: str) -> BlockType:
 
     # Check for code block
@@ -51,16 +41,46 @@ def block_to_block_type(block: str) -> BlockType:
 
 
 def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
     children = []
-    for block in blocks:
-        html_block = block_to_html_node(block)
+    for block in lex_markdown(markdown):
+        html_block = typed_block_to_html_node(block)
         children.append(html_block)
     return ParentNode("div", children, None)
 
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+def typed_block_to_html_node(block, to_children=None):
+    # Lexed blocks arrive classified with their inline texts extracted, so
+    # nothing is re-scanned here. to_children turns an inline text into nodes,
+    # e.g. from TextNodes tokenized ahead of time.
+    if to_children is None:
+        to_children = text_to_children
+    block_type = block.block_type
+    if block_type == BlockType.PARAGRAPH:
+        if not block.text:
+            return ParentNode("", [])
+        return ParentNode("p", to_children(block.items[0]))
+    if block_type == BlockType.HEADING:
+        return heading_to_html_node(block.text, to_children)
+    if block_type == BlockType.CODE:
+        return code_to_html_node(block.text)
+    if block_type == BlockType.ORDERED_LIST:
+        return ParentNode("ol", items_to_html_nodes(block.items, to_children))
+    if block_type == BlockType.UNORDERED_LIST:
+        return ParentNode("ul", items_to_html_nodes(block.items, to_children))
+    if block_type == BlockType.QUOTE:
+        return ParentNode("blockquote", to_children(block.items[0]))
+    raise ValueError("invalid block type")
+
+
+def items_to_html_nodes(items, to_children=None):
+    if to_children is None:
+        to_children = text_to_children
+    return [ParentNode("li", to_children(item)) for item in items]
+
+
+def block_to_html_node(block, block_type=None):
+    if block_type is None:
+        block_type = block_to_block_type(block)
     if block_type == BlockType.PARAGRAPH:
         return paragraph_to_html_node(block)
     if block_type == BlockType.HEADING:
@@ -95,7 +115,7 @@ def paragraph_to_html_node(block):
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
+def heading_to_html_node(block, to_children=None):
     level = 0
     for char in block:
         if char == "#":
@@ -111,8 +131,9 @@ def heading_to_html_node(block):
         )
     if not text:
         raise ValueError(f"invalid heading level: {level}")
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    if to_children is None:
+        to_children = text_to_children
+    return ParentNode(f"h{level}", to_children(text))
 
 
 def code_to_html_node(block):
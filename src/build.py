@@ -0,0 +1,166 @@
+import os
+
+from assets import AssetManifest, fingerprint_static_files
+from block_cache import DEFAULT_MAX_BYTES, BlockCache
+from compress import DEFAULT_MIN_SIZE, compress_outputs
+from copystatic import sync_static_files
+from helpers import generate_pages_recursive
+from htmlnode import RenderContext
+from images import ImageIndex
+from linkgraph import (LinkGraph, SiteIndex, page_url, print_broken_links,
+                       site_urls)
+from manifest import Manifest
+from output import OutputWriter, save_changed_list
+from profiler import profile_stage
+from search import SearchIndex
+
+dir_path_static = "./static"
+dir_path_public = "./docs"
+dir_path_content = "./content"
+dir_path_templates = "./templates"
+dir_path_cache = "./.ssg"
+
+
+def build(
+    basepath,
+    incremental=False,
+    jobs=1,
+    static_strategy="copy",
+    profiler=None,
+    block_cache_size=DEFAULT_MAX_BYTES,
+    in_flight=0,
+    compress=False,
+    compress_min_size=DEFAULT_MIN_SIZE,
+    minify=False,
+    site_url=None,
+    search_index=False,
+    image_dimensions=False,
+    fingerprint_assets=False,
+    warm=None,
+    backlinks=False,
+):
+    # Full builds regenerate every page but keep the public directory, so
+    # unchanged outputs keep their mtimes and deploys only see real changes.
+    manifest = Manifest.load(os.path.join(dir_path_cache, "manifest.json"))
+
+    print("Copying static files to public directory...")
+    with profile_stage(profiler, "static_copy"):
+        static_changed = sync_static_files(
+            dir_path_static, dir_path_public, manifest, static_strategy
+        )
+    assets = None
+    if fingerprint_assets:
+        with profile_stage(profiler, "fingerprint"):
+            assets = load_asset_manifest()
+            static_changed += fingerprint_static_files(
+                dir_path_static, dir_path_public, manifest, assets, static_strategy
+            )
+            assets.save()
+
+    block_cache = None
+    if block_cache_size > 0:
+        block_cache = keep_warm(
+            warm,
+            "blocks",
+            lambda: BlockCache.load(
+                os.path.join(dir_path_cache, "blocks.json"), block_cache_size
+            ),
+        )
+        block_cache.max_bytes = block_cache_size
+        # Hit and miss counts are per build.
+        block_cache.drain()
+    images = None
+    if image_dimensions:
+        images = keep_warm(warm, "images", load_image_index)
+    context = RenderContext(basepath, minify, search_index, images, assets)
+    writer = OutputWriter()
+    site = SiteIndex()
+    graph = LinkGraph.load(os.path.join(dir_path_cache, "links.json"))
+    state_paths = [graph.path]
+    search = None
+    if search_index:
+        search = SearchIndex.load(os.path.join(dir_path_cache, "search.json"))
+        state_paths.append(search.path)
+    page_paths = generate_pages_recursive(
+        dir_path_content,
+        dir_path_templates,
+        dir_path_public,
+        context,
+        manifest,
+        jobs,
+        profiler,
+        block_cache,
+        in_flight,
+        writer,
+        # Skipped pages would be missing from an index that doesn't exist yet.
+        rebuild=not incremental
+        or not all(os.path.exists(path) for path in state_paths),
+        site=site,
+    )
+    print(f" * {len(writer.changed)} pages changed, {writer.unchanged} unchanged")
+    if block_cache is not None:
+        block_cache.save()
+        block_cache.print_summary()
+    if images is not None:
+        images.save()
+    if assets is not None:
+        headers_path = os.path.join(dir_path_public, "_headers")
+        writer.write(headers_path, assets.headers(context))
+        manifest.record(headers_path, {"generated": "headers"})
+
+    with profile_stage(profiler, "link_graph"):
+        graph.update(site, dir_path_public)
+        graph.retain(page_url(path, dir_path_public) for path in page_paths)
+        if site_url is not None:
+            sitemap_path = os.path.join(dir_path_public, "sitemap.xml")
+            writer.write(sitemap_path, graph.sitemap(site_url, context))
+            manifest.record(sitemap_path, {"generated": "sitemap"})
+        if backlinks:
+            backlinks_path = os.path.join(dir_path_public, "backlinks.json")
+            writer.write(backlinks_path, graph.backlinks_json(context))
+            manifest.record(backlinks_path, {"generated": "backlinks"})
+        known_urls = site_urls(manifest.outputs, dir_path_public)
+        print_broken_links(graph.broken_links(known_urls))
+        graph.save()
+
+    if search is not None:
+        with profile_stage(profiler, "search_index"):
+            search.update(site, dir_path_public)
+            search.retain(page_url(path, dir_path_public) for path in page_paths)
+            search.write(
+                os.path.join(dir_path_public, "search"), writer, manifest, context
+            )
+            search.save()
+
+    compressed = []
+    if compress:
+        print("Compressing outputs...")
+        with profile_stage(profiler, "compress"):
+            compressed = compress_outputs(manifest, compress_min_size, jobs)
+
+    manifest.prune(dir_path_public)
+    if not incremental:
+        manifest.remove_untracked(dir_path_public)
+    manifest.save()
+    save_changed_list(
+        os.path.join(dir_path_cache, "changed.txt"),
+        static_changed + writer.changed + compressed,
+    )
+
+
+def keep_warm(warm, name, load):
+    # A long-running build process passes a dict that keeps loaded state
+    # between builds; a one-off build just loads it.
+    if warm is None:
+        return load()
+    if name not in warm:
+        warm[name] = load()
+    return warm[name]
+
+
+def load_asset_manifest():
+    return AssetManifest.load(os.path.join(dir_path_cache, "assets.json"))
+
+
+def load_image_index():
+    return ImageIndex.load(os.path.join(dir_path_cache, "images.json"), dir_path_static)
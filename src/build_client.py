@@ -0,0 +1,45 @@
+import json
+import os
+import socket
+import sys
+
+# Kept free of generator imports so a build request costs only interpreter
+# startup; the path matches build.dir_path_cache.
+DEFAULT_SOCKET_PATH = "./.ssg/build.sock"
+STATUS_MARKER = "\0"
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def request_build(argv, socket_path=DEFAULT_SOCKET_PATH, output=None):
+    # Streams the daemon's build output and returns its exit status, or None
+    # when no daemon is listening.
+    if output is None:
+        output = sys.stdout
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+    with client, client.makefile("rw", encoding="utf-8", newline="\n") as stream:
+        stream.write(json.dumps({"args": argv}) + "\n")
+        stream.flush()
+        for line in stream:
+            if line.startswith(STATUS_MARKER):
+                return json.loads(line[len(STATUS_MARKER) :])["status"]
+            output.write(line)
+            output.flush()
+    raise ValueError("build daemon closed the connection mid-build")
+
+
+def main():
+    argv = sys.argv[1:]
+    status = request_build(argv)
+    if status is None:
+        # No daemon: build in a fresh process, exactly as main.py would.
+        os.execv(sys.executable, [sys.executable, MAIN_PATH, *argv])
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
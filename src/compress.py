@@ -0,0 +1,91 @@
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css")
+DEFAULT_MIN_SIZE = 1024
+SIDECAR_EXTENSIONS = {"gzip": ".gz", "brotli": ".br"}
+
+
+def available_formats():
+    if brotli is None:
+        return ("gzip",)
+    return ("gzip", "brotli")
+
+
+def compress_data(data, format):
+    if format == "gzip":
+        # A fixed mtime keeps the sidecar byte-identical across builds.
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if format == "brotli":
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"invalid compression format: {format}")
+
+
+def compress_file(from_path, format):
+    sidecar_path = from_path + SIDECAR_EXTENSIONS[format]
+    with open(from_path, "rb") as file:
+        data = compress_data(file.read(), format)
+    temp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, sidecar_path)
+    return sidecar_path
+
+
+def compress_outputs(manifest, min_size=DEFAULT_MIN_SIZE, jobs=1, formats=None):
+    # Sidecars are outputs like any other: recorded in the manifest with the
+    # hash of the file they compress, so unchanged files are skipped and
+    # sidecars of removed or shrunk files are pruned.
+    if formats is None:
+        formats = available_formats()
+    pending = []
+    skipped = 0
+    for dest_path in sorted(manifest.outputs):
+        if not dest_path.endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+        stat = os.stat(dest_path)
+        if stat.st_size < min_size:
+            continue
+        key = None
+        for format in formats:
+            sidecar_path = dest_path + SIDECAR_EXTENSIONS[format]
+            if key is None:
+                key = manifest.static_key(dest_path, sidecar_path, stat)
+            sidecar_key = dict(key, format=format)
+            if manifest.is_fresh(sidecar_path, sidecar_key):
+                skipped += 1
+            else:
+                pending.append((dest_path, format))
+            manifest.record(sidecar_path, sidecar_key)
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            written = list(executor.map(compress_file, *zip(*pending)))
+    else:
+        written = [compress_file(from_path, format) for from_path, format in pending]
+    print(f" * {len(written)} compressed sidecars written, {skipped} unchanged")
+    return written
+
+
+def refresh_sidecars(dest_path, min_size=DEFAULT_MIN_SIZE, formats=None):
+    # For one output rewritten or removed outside a build, e.g. in watch mode:
+    # recompress it, or drop its sidecars once it is gone or too small.
+    if not dest_path.endswith(COMPRESSIBLE_EXTENSIONS):
+        return []
+    if formats is None:
+        formats = available_formats()
+    keep = os.path.exists(dest_path) and os.path.getsize(dest_path) >= min_size
+    written = []
+    for format in formats:
+        sidecar_path = dest_path + SIDECAR_EXTENSIONS[format]
+        if keep:
+            written.append(compress_file(dest_path, format))
+        elif os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+    return written
@@ -1,16 +1,111 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
+from output import is_same_file
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STRATEGIES = ("copy", "hardlink", "reflink")
+# Linux FICLONE ioctl: share the source's extents on btrfs/xfs/etc.
+FICLONE = 0x40049409
+
+
+def copy_files_recursive(source_dir_path, dest_dir_path, manifest=None):
+    return sync_static_files(source_dir_path, dest_dir_path, manifest)
+
+
+def sync_static_files(
+    source_dir_path, dest_dir_path, manifest=None, strategy="copy", jobs=None
+):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"invalid static strategy: {strategy}")
+    pending = []
+    skipped = scan_static_files(
+        source_dir_path, dest_dir_path, manifest, pending, strategy
+    )
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(place_file, from_path, dest_path, strategy)
+            for from_path, dest_path in pending
+        ]
+    for future in futures:
+        future.result()
+    print(f" * {len(pending)} static files updated, {skipped} unchanged")
+    return [dest_path for _, dest_path in pending]
+
+
+def scan_static_files(
+    source_dir_path, dest_dir_path, manifest, pending, strategy="copy"
+):
     if not os.path.exists(dest_dir_path):
         os.mkdir(dest_dir_path)
 
-    for filename in os.listdir(source_dir_path):
-        from_path = os.path.join(source_dir_path, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        print(f" * {from_path} -> {dest_path}")
-        if os.path.isfile(from_path):
-            shutil.copy(from_path, dest_path)
-        else:
-            copy_files_recursive(from_path, dest_path)
+    skipped = 0
+    with os.scandir(source_dir_path) as entries:
+        for entry in entries:
+            dest_path = os.path.join(dest_dir_path, entry.name)
+            if entry.is_dir():
+                skipped += scan_static_files(
+                    entry.path, dest_path, manifest, pending, strategy
+                )
+            elif is_unchanged(entry, dest_path, manifest, strategy):
+                skipped += 1
+            else:
+                pending.append((entry.path, dest_path))
+    return skipped
+
+
+def is_unchanged(entry, dest_path, manifest, strategy="copy"):
+    stat = entry.stat()
+    if manifest is not None:
+        # A file placed by another strategy is re-placed, e.g. a copy that
+        # should now be a hardlink.
+        key = {**manifest.static_key(entry.path, dest_path, stat), "strategy": strategy}
+        fresh = manifest.is_fresh(dest_path, key)
+        if not fresh and dest_path not in manifest.entries:
+            # An output tree built without a manifest may already hold a copy,
+            # but never trust a hardlink: writes through it reach the source.
+            fresh = is_same_file(entry.path, dest_path) and not os.path.samefile(
+                entry.path, dest_path
+            )
+        manifest.record(dest_path, key)
+        return fresh
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    return (
+        dest_stat.st_size == stat.st_size
+        and dest_stat.st_mtime_ns == stat.st_mtime_ns
+    )
+
+
+def place_file(from_path, dest_path, strategy):
+    # Never write through an existing output: it may be a hardlink to the source.
+    if os.path.lexists(dest_path):
+        os.unlink(dest_path)
+    if strategy == "hardlink":
+        try:
+            os.link(from_path, dest_path)
+            return
+        except OSError:
+            pass
+    elif strategy == "reflink" and reflink_file(from_path, dest_path):
+        return
+    shutil.copy2(from_path, dest_path)
+
+
+def reflink_file(from_path, dest_path):
+    if fcntl is None:
+        return False
+    with open(from_path, "rb") as source, open(dest_path, "wb") as dest:
+        try:
+            fcntl.ioctl(dest.fileno(), FICLONE, source.fileno())
+        except OSError:
+            return False
+    shutil.copystat(from_path, dest_path)
+    return True
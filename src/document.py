@@ -0,0 +1,125 @@
+import re
+from itertools import chain
+
+from block_lexer import BlockType
+from blocks import heading_to_html_node, typed_block_to_html_node
+from template import URL_SLOT
+
+# Leaves produced from TEXT, BOLD, ITALIC and LINK text nodes.
+PROSE_TAGS = frozenset((None, "b", "i", "a"))
+TERM_PATTERN = re.compile(r"\w\w+")
+
+
+class PageStream:
+    __slots__ = ("title", "heading", "blocks")
+
+    def __init__(self, blocks) -> None:
+        # Lexes ahead only as far as the first h1, so the title is known before
+        # any content is written while each block is still lexed just once.
+        blocks = iter(blocks)
+        ahead = []
+        self.title = None
+        # The title block and its node, built once for the title and the HTML.
+        self.heading = None
+        for block in blocks:
+            ahead.append(block)
+            if block.block_type == BlockType.HEADING:
+                node = heading_to_html_node(block.text)
+                if node.tag == "h1":
+                    self.title = node.children[0].value
+                    self.heading = (block, node)
+                    break
+        self.blocks = chain(ahead, blocks)
+
+    def __repr__(self) -> str:
+        return f"PageStream({self.title})"
+
+    def iter_html(self, context=None, cache=None, facts=None):
+        return iter_document_html(self.blocks, context, cache, facts, self.heading)
+
+
+def require_title(title):
+    if title is None:
+        raise ValueError("no title found")
+    return title
+
+
+def page_values(title, content, context):
+    # What a page's template is filled with, shared by every build path.
+    return {"Title": require_title(title), "Content": content, URL_SLOT: context.url}
+
+
+def iter_document_html(blocks, context=None, cache=None, facts=None, heading=None):
+    # Renders the same markup as markdown_to_html_node, one block at a time,
+    # without keeping earlier blocks or their nodes alive. heading is a block
+    # whose node was already built, paired with that node.
+    yield "<div>"
+    for block in blocks:
+        node = heading[1] if heading is not None and block is heading[0] else None
+        if cache is not None:
+            html, rendered_facts = cache.render(block, context, node)
+            yield html
+            if facts is not None:
+                facts.add(rendered_facts)
+            continue
+        if node is None:
+            node = typed_block_to_html_node(block)
+        yield from node.iter_html(context)
+        if facts is not None:
+            facts.add(block_facts(node, context is not None and context.search))
+    yield "</div>"
+
+
+def block_facts(node, terms=False):
+    # What a rendered block references, kept as source URLs (before any
+    # basepath rewriting) so the site graph doesn't depend on render options,
+    # plus the words of its prose when building a search index.
+    facts = {"links": [], "images": [], "terms": []}
+    prose = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children:
+            # Code blocks are not prose; they contain no links either.
+            if node.tag != "pre":
+                stack.extend(reversed(node.children))
+            continue
+        if node.tag == "img":
+            if node.props and "src" in node.props:
+                facts["images"].append(node.props["src"])
+            continue
+        if node.tag == "a" and node.props and "href" in node.props:
+            facts["links"].append(node.props["href"])
+        if terms and node.tag in PROSE_TAGS:
+            prose.append(node.value)
+    if prose:
+        # One pass over the block's text is much cheaper than one per leaf.
+        facts["terms"] = TERM_PATTERN.findall(" ".join(prose).lower())
+    return facts
+
+
+def facts_size(facts):
+    return sum(len(item) for items in facts.values() for item in items)
+
+
+class PageFacts:
+    __slots__ = ("title", "links", "images", "terms")
+
+    def __init__(self, title=None) -> None:
+        self.title = title
+        self.links = []
+        self.images = []
+        self.terms = []
+
+    def add(self, facts):
+        self.links.extend(facts["links"])
+        self.images.extend(facts["images"])
+        self.terms.extend(facts["terms"])
+
+    def to_json(self):
+        return {
+            "title": self.title,
+            "links": self.links,
+            "images": self.images,
+            "terms": self.terms,
+        }
@@ -1,57 +1,350 @@
 import os
-import re
+from concurrent.futures import ProcessPoolExecutor
 
+from block_cache import DEFAULT_MAX_BYTES, BlockCache
+from block_lexer import lex_file, lex_markdown
+from document import PageFacts, PageStream, page_values, require_title
+from htmlnode import RenderContext
+from inline_markdown import extract_markdown_images, extract_markdown_links
+from linkgraph import SiteIndex
+from output import OutputWriter
+from pipeline import generate_pages_pipelined
+from profiler import Profiler, profile_stage
+from template import DEFAULT_LAYOUT, TemplateRegistry, load_template
 
-def extract_markdown_images(text):
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+LAYOUT_FILE = "_layout"
 
 
-def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+def extract_title(markdown):
+    return require_title(PageStream(lex_markdown(markdown)).title)
 
 
-def extract_title(markdown):
-    from blocks import BlockType, block_to_block_type, heading_to_html_node
-    from inline_markdown import markdown_to_blocks
+def generate_page(
+    from_path,
+    template_path,
+    dest_path,
+    context,
+    profiler=None,
+    block_cache=None,
+    writer=None,
+    site=None,
+    template=None,
+):
+    # template, when given, is template_path already compiled by a registry.
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    context = RenderContext.of(context)
+    if writer is None:
+        writer = OutputWriter()
+    if template is None:
+        template = load_template(template_path, context.minify)
+    if profiler is not None:
+        profile_page(
+            from_path,
+            template,
+            dest_path,
+            context,
+            profiler,
+            block_cache,
+            writer,
+            site,
+        )
+        return
 
-    blocks = markdown_to_blocks(markdown)
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.HEADING:
-            node = heading_to_html_node(block)
-            if node.tag == "h1":
-                return node.children[0].value
-    raise ValueError("no title found")
+    with open(from_path, "r") as file:
+        # The title sits in the template head, ahead of the content; the page
+        # is lexed once, the blocks before its h1 held back until it is found.
+        page = PageStream(lex_file(file))
+        facts = PageFacts(page.title) if site is not None else None
+        content = page.iter_html(context, block_cache, facts)
+        values = page_values(page.title, content, context)
+        with writer.open(dest_path) as output:
+            template.render_into(output, values)
+    if site is not None:
+        site.add(dest_path, facts)
 
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    from blocks import markdown_to_html_node
+def profile_page(
+    from_path,
+    template,
+    dest_path,
+    context,
+    profiler,
+    block_cache=None,
+    writer=None,
+    site=None,
+):
+    # The same lexer, block cache and writer as a normal build, but each stage
+    # runs to completion before the next, so their costs can be told apart.
+    if writer is None:
+        writer = OutputWriter()
+    with profiler.stage("read", from_path):
+        with open(from_path, "r") as file:
+            markdown = file.read()
+    with profiler.stage("parse", from_path):
+        page = PageStream(list(lex_markdown(markdown)))
+        title = require_title(page.title)
+    facts = PageFacts(title) if site is not None else None
+    with profiler.stage("render", from_path):
+        content = "".join(page.iter_html(context, block_cache, facts))
+    values = page_values(title, content, context)
+    with profiler.stage("template_fill", from_path):
+        file_content = template.render(values)
+    with profiler.stage("write", from_path):
+        writer.write(dest_path, file_content)
+    if site is not None:
+        site.add(dest_path, facts)
 
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, "r") as file:
-        markdown = file.read()
-        node = markdown_to_html_node(markdown)
-        content = node.to_html()
-        title = extract_title(markdown)
-    with open(template_path, "r") as file:
-        template = file.read()
-
-    file_content = template.replace("{{ Title }}", title)
-    file_content = file_content.replace("{{ Content }}", content)
-    file_content = file_content.replace('href="/', 'href="' + basepath)
-    file_content = file_content.replace('src="/', 'src="' + basepath)
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w") as file:
-        file.write(file_content)
-
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    file_paths = []
+
+# Per-process state for parallel builds, set up once by init_page_worker.
+_worker_templates = None
+_worker_context = None
+_worker_profiler = None
+_worker_block_cache = None
+_worker_in_flight = 0
+_worker_writer = None
+_worker_site = None
+
+
+def init_page_worker(
+    templates,
+    context,
+    profile=False,
+    block_cache_path=None,
+    in_flight=0,
+    block_cache_size=DEFAULT_MAX_BYTES,
+):
+    global _worker_templates, _worker_context, _worker_profiler
+    global _worker_block_cache, _worker_in_flight, _worker_writer, _worker_site
+    _worker_templates = templates
+    _worker_context = context
+    _worker_profiler = Profiler() if profile else None
+    if block_cache_path is not None:
+        _worker_block_cache = BlockCache.load(block_cache_path, block_cache_size)
+    _worker_in_flight = in_flight
+    _worker_writer = OutputWriter()
+    _worker_site = SiteIndex()
+
+
+def generate_page_batch(pages):
+    if _worker_in_flight > 0:
+        errors = generate_pages_pipelined(
+            pages,
+            _worker_templates,
+            _worker_context,
+            _worker_in_flight,
+            _worker_profiler,
+            _worker_block_cache,
+            _worker_writer,
+            _worker_site,
+        )
+    else:
+        errors = []
+        for from_path, dest_path, layout in pages:
+            try:
+                generate_page(
+                    from_path,
+                    _worker_templates.paths[layout],
+                    dest_path,
+                    _worker_context,
+                    _worker_profiler,
+                    _worker_block_cache,
+                    _worker_writer,
+                    _worker_site,
+                    _worker_templates.get(layout),
+                )
+            except Exception as e:
+                errors.append((from_path, f"{type(e).__name__}: {e}"))
+    events = _worker_profiler.drain() if _worker_profiler is not None else []
+    cache_updates = None
+    if _worker_block_cache is not None:
+        cache_updates = _worker_block_cache.drain()
+    written = _worker_writer.drain()
+    return errors, events, cache_updates, written, _worker_site.drain()
+
+
+def chunk_pages(pages, jobs):
+    # A few batches per worker keeps IPC low while still balancing uneven pages.
+    size = max(1, -(-len(pages) // (jobs * 4)))
+    return [pages[i : i + size] for i in range(0, len(pages), size)]
+
+
+def generate_pages_parallel(
+    pages,
+    templates,
+    context,
+    jobs,
+    profiler=None,
+    block_cache=None,
+    in_flight=0,
+    writer=None,
+    site=None,
+):
+    errors = []
+    # Workers load the cache as the previous build saved it and send back what
+    # they used and rendered.
+    block_cache_path = None
+    block_cache_size = DEFAULT_MAX_BYTES
+    if block_cache is not None:
+        block_cache_path = block_cache.path
+        block_cache_size = block_cache.max_bytes
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_page_worker,
+        initargs=(
+            templates,
+            context,
+            profiler is not None,
+            block_cache_path,
+            in_flight,
+            block_cache_size,
+        ),
+    ) as executor:
+        batches = chunk_pages(pages, jobs)
+        for batch_errors, events, cache_updates, written, pages in executor.map(
+            generate_page_batch, batches
+        ):
+            errors.extend(batch_errors)
+            if writer is not None:
+                writer.merge(written)
+            if site is not None:
+                site.merge(pages)
+            if profiler is not None:
+                profiler.merge(events)
+            if block_cache is not None and cache_updates is not None:
+                block_cache.merge(cache_updates)
+    raise_page_errors(errors)
+
+
+def raise_page_errors(errors):
+    if errors:
+        details = "\n".join(f"  {path}: {message}" for path, message in errors)
+        raise ValueError(f"failed to generate {len(errors)} page(s):\n{details}")
+
+
+def page_dest_path(file, dir_path_content, dest_dir_path):
+    new_file = os.path.splitext(file)[0] + ".html"
+    return new_file.replace(dir_path_content, dest_dir_path)
+
+
+def find_pages(dir_path_content):
+    # (source, layout) for every page. A "_layout" file names the layout for
+    # its directory and everything below it; "name.md: layout" lines in it
+    # pick one for a single page.
+    pages = []
+    layouts = {}
     for root, _, files in os.walk(dir_path_content):
+        key = os.path.normpath(root)
+        layout = layouts.get(os.path.dirname(key), DEFAULT_LAYOUT)
+        page_layouts = {}
+        if LAYOUT_FILE in files:
+            layout_path = os.path.join(root, LAYOUT_FILE)
+            layout, page_layouts = read_layout_file(layout_path, layout)
+        layouts[key] = layout
         for file in files:
-            file_paths.append(os.path.join(root, file))
+            if file != LAYOUT_FILE:
+                pages.append((os.path.join(root, file), page_layouts.get(file, layout)))
+    return pages
+
+
+def read_layout_file(path, layout):
+    page_layouts = {}
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, separator, page_layout = line.partition(":")
+            if separator:
+                page_layouts[name.strip()] = page_layout.strip()
+            else:
+                layout = line
+    return layout, page_layouts
+
+
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    context,
+    manifest=None,
+    jobs=1,
+    profiler=None,
+    block_cache=None,
+    in_flight=0,
+    writer=None,
+    rebuild=False,
+    site=None,
+):
+    context = RenderContext.of(context)
+    with profile_stage(profiler, "discovery"):
+        templates = TemplateRegistry.load(template_path, context.minify)
+        found = find_pages(dir_path_content)
+        for file, layout in found:
+            if layout not in templates.templates:
+                raise ValueError(f"unknown layout for {file}: {layout}")
+
+        # Any template may be included by any other, so pages key on all of
+        # them and on their own layout, plus the assets that layout links to.
+        template_hashes = {}
+        # Every page of the site, including the ones fresh enough to skip.
+        page_paths = []
+        pages = []
+        for file, layout in found:
+            new_file = page_dest_path(file, dir_path_content, dest_dir_path)
+            page_paths.append(new_file)
+            if manifest is not None:
+                template_hash = template_hashes.get(layout)
+                if template_hash is None:
+                    template_hash = f"{layout}\0{templates.digest}"
+                    if context.assets is not None:
+                        urls = templates.get(layout).urls()
+                        template_hash += context.assets.signature(urls)
+                    template_hashes[layout] = template_hash
+                key = manifest.page_key(file, template_hash, context)
+                fresh = manifest.is_fresh(new_file, key)
+                manifest.record(new_file, key)
+                if fresh and not rebuild:
+                    continue
+            pages.append((file, new_file, layout))
 
-    for file in file_paths:
-        new_file = os.path.splitext(file)[0] + ".html"
-        new_file = new_file.replace(dir_path_content, dest_dir_path)
-        generate_page(file, template_path + "/template.html", new_file, basepath)
+    if jobs > 1 and len(pages) > 1:
+        generate_pages_parallel(
+            pages,
+            templates,
+            context,
+            jobs,
+            profiler,
+            block_cache,
+            in_flight,
+            writer,
+            site,
+        )
+        return page_paths
+    if writer is None:
+        writer = OutputWriter()
+    if in_flight > 0:
+        errors = generate_pages_pipelined(
+            pages,
+            templates,
+            context,
+            in_flight,
+            profiler,
+            block_cache,
+            writer,
+            site,
+        )
+        raise_page_errors(errors)
+        return page_paths
+    for file, new_file, layout in pages:
+        generate_page(
+            file,
+            templates.paths[layout],
+            new_file,
+            context,
+            profiler,
+            block_cache,
+            writer,
+            site,
+            templates.get(layout),
+        )
+    return page_paths
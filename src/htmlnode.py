@@ -1,51 +1,170 @@
+import copy
+import re
+import sys
+
+from inline_markdown import extract_markdown_images, extract_markdown_links
 from textnode import TextType
 
+URL_ATTRIBUTES = frozenset(("href", "src"))
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class RenderContext:
+    __slots__ = ("basepath", "minify", "search", "images", "assets")
+
+    def __init__(
+        self, basepath="/", minify=False, search=False, images=None, assets=None
+    ) -> None:
+        self.basepath = basepath
+        self.minify = minify
+        # Collect each block's words for the search index alongside its links.
+        self.search = search
+        # An ImageIndex to size <img> tags from, or None to leave them bare.
+        self.images = images
+        # An AssetManifest mapping static URLs to fingerprinted ones, or None.
+        self.assets = assets
+
+    @classmethod
+    def of(cls, value):
+        # Build entry points accept either a context or a bare basepath.
+        return value if isinstance(value, cls) else cls(value)
+
+    def url(self, value):
+        # Root-relative URLs move under the basepath; protocol-relative ones don't.
+        if value.startswith("/") and not value.startswith("//"):
+            if self.assets is not None:
+                value = self.assets.url(value)
+            return self.basepath + value[1:]
+        return value
+
+    def attribute(self, key, value):
+        if key in URL_ATTRIBUTES:
+            return self.url(value)
+        return value
+
+    def image_props(self, props):
+        # Reserves the image's box before it loads, and defers off-screen ones.
+        if self.images is None:
+            return props
+        props = dict(props)
+        size = self.images.size(props.get("src", ""))
+        if size is not None:
+            props["width"], props["height"] = str(size[0]), str(size[1])
+        props.setdefault("loading", "lazy")
+        props.setdefault("decoding", "async")
+        return props
+
+    def text(self, value):
+        if self.minify:
+            return WHITESPACE_PATTERN.sub(" ", value)
+        return value
+
+    def preformatted(self):
+        # Whitespace inside <pre> is content, so it is never minified.
+        if not self.minify:
+            return self
+        context = copy.copy(self)
+        context.minify = False
+        return context
+
+    def signature(self, markdown):
+        # What rendering this markdown reads besides its own text: the sizes of
+        # the images it shows and the fingerprints of the assets it links to.
+        if "](" not in markdown or (self.images is None and self.assets is None):
+            return ""
+        images = [src for _, src in extract_markdown_images(markdown)]
+        parts = []
+        if self.images is not None:
+            parts.append(self.images.signature(images))
+        if self.assets is not None:
+            links = [href for _, href in extract_markdown_links(markdown)]
+            parts.append(self.assets.signature(images + links))
+        return "".join(parts)
+
+    def cache_key(self):
+        # Every option changes the rendered markup or the facts gathered with
+        # it, so all of them are part of the key for cached fragments.
+        return repr(tuple(getattr(self, name) for name in self.__slots__))
+
 
 class HTMLNode:
+    # Pages build hundreds of thousands of nodes, so skip the per-instance dict.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None) -> None:
-        self.tag = tag
+        self.tag = sys.intern(tag) if tag else tag
         self.value = value
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def to_html(self, context=None):
+        return "".join(self.iter_html(context))
+
+    def iter_html(self, context=None):
         raise NotImplementedError()
 
-    def props_to_html(self):
+    def render_into(self, writer, context=None):
+        writer.writelines(self.iter_html(context))
+
+    def props_to_html(self, context=None):
         if self.props == None:
             return ""
-        return "".join(f' {key}="{value}"' for key, value in self.props.items())
+        if context is None:
+            return "".join(f' {key}="{value}"' for key, value in self.props.items())
+        props = self.props
+        if self.tag == "img":
+            props = context.image_props(props)
+        return "".join(
+            f' {key}="{context.attribute(key, value)}"' for key, value in props.items()
+        )
 
     def __repr__(self):
         return f"\n tag:{self.tag}\n value:{self.value} \n" + self.props_to_html()
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None) -> None:
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
+    def to_html(self, context=None):
         if (self.tag == None or self.tag == "") and self.props != None:
             raise ValueError("nust have a tag if using props")
+        value = self.value
+        if context is not None and context.minify:
+            value = context.text(f"{value}")
         if self.tag == None or self.tag == "":
-            return f"{self.value}"
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return f"{value}"
+        return f"<{self.tag}{self.props_to_html(context)}>{value}</{self.tag}>"
+
+    def iter_html(self, context=None):
+        # A leaf is a single chunk; its size is bounded by its own value.
+        yield self.to_html(context)
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None) -> None:
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def iter_html(self, context=None):
         if self.tag == None:
             raise ValueError("no tag")
         if self.children == None:
             raise ValueError("no children")
-        childHtml = "".join(f"{child.to_html()}" for child in self.children)
-        if self.tag == None or self.tag == "":
-            return f"{childHtml}"
+        if self.tag == "":
+            for child in self.children:
+                yield from child.iter_html(context)
+            return
+        if self.tag == "pre" and context is not None:
+            context = context.preformatted()
 
-        return f"<{self.tag}{self.props_to_html()}>{childHtml}</{self.tag}>"
+        yield f"<{self.tag}{self.props_to_html(context)}>"
+        for child in self.children:
+            yield from child.iter_html(context)
+        yield f"</{self.tag}>"
 
 
 def text_node_to_html_node(text_node):
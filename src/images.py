@@ -0,0 +1,126 @@
+import hashlib
+import os
+import struct
+
+from statefile import load_state, save_state
+
+IMAGE_INDEX_VERSION = 1
+# PNG, GIF and WebP keep their dimensions in the first 30 bytes; JPEG needs a
+# walk over the segments ahead of the frame header.
+HEADER_SIZE = 32
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(path):
+    # (width, height) read from the file header, or None for formats or files
+    # that can't be measured without decoding.
+    with open(path, "rb") as file:
+        header = file.read(HEADER_SIZE)
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return webp_size(header)
+        if header[:2] == b"\xff\xd8":
+            return jpeg_size(file)
+    return None
+
+
+def webp_size(header):
+    chunk = header[12:16]
+    if chunk == b"VP8 " and len(header) >= 30:
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(header) >= 25:
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(header) >= 30:
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def jpeg_size(file):
+    # Skips from segment to segment by their lengths until a frame header.
+    file.seek(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        while marker[1] == 0xFF:
+            marker = marker[1:] + file.read(1)
+            if len(marker) < 2:
+                return None
+        if 0xD0 <= marker[1] <= 0xD9 or marker[1] == 0x01:
+            continue
+        length = file.read(2)
+        if len(length) < 2:
+            return None
+        (length,) = struct.unpack(">H", length)
+        if marker[1] in JPEG_SOF_MARKERS:
+            segment = file.read(5)
+            if len(segment) < 5:
+                return None
+            height, width = struct.unpack(">HH", segment[1:5])
+            return width, height
+        file.seek(length - 2, os.SEEK_CUR)
+
+
+class ImageIndex:
+    def __init__(self, path, static_dir_path, entries=None) -> None:
+        self.path = path
+        self.static_dir_path = static_dir_path
+        # static-relative path -> [mtime_ns, size, width, height]
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, path, static_dir_path):
+        data = load_state(path, IMAGE_INDEX_VERSION)
+        if data is None:
+            return cls(path, static_dir_path)
+        return cls(path, static_dir_path, data.get("entries", {}))
+
+    def size(self, src):
+        # Only root-relative URLs name a file under static/; anything else is
+        # left for the browser to measure.
+        if not src.startswith("/") or src.startswith("//"):
+            return None
+        relative = src.split("?", 1)[0].split("#", 1)[0].lstrip("/")
+        try:
+            stat = os.stat(os.path.join(self.static_dir_path, relative))
+        except OSError:
+            return None
+        entry = self.entries.get(relative)
+        if entry is None or entry[:2] != [stat.st_mtime_ns, stat.st_size]:
+            try:
+                size = image_size(os.path.join(self.static_dir_path, relative))
+            except OSError:
+                return None
+            width, height = size if size is not None else (None, None)
+            entry = [stat.st_mtime_ns, stat.st_size, width, height]
+            self.entries[relative] = entry
+        if entry[2] is None:
+            return None
+        return entry[2], entry[3]
+
+    def signature(self, srcs):
+        # Digest of the sizes of the given images, so cached output that
+        # embeds them goes stale when an image is resized.
+        digest = hashlib.blake2b(digest_size=16)
+        for src in srcs:
+            digest.update(f"{src}\0{self.size(src)}\0".encode())
+        return digest.hexdigest()
+
+    def save(self):
+        save_state(
+            self.path,
+            {"version": IMAGE_INDEX_VERSION, "entries": self.entries},
+            sort_keys=True,
+        )
+
+    def __repr__(self):
+        # Part of RenderContext.cache_key; the sizes themselves are keyed per
+        # block and per page through signature().
+        return f"ImageIndex({self.static_dir_path!r})"
@@ -1,6 +1,22 @@
-from helpers import extract_markdown_images, extract_markdown_links
+import re
+
+from block_lexer import lex_markdown
 from textnode import TextNode, TextType
 
+INLINE_DELIMITER_PATTERN = re.compile(r"\*\*|_|`")
+INLINE_LINK_PATTERN = re.compile(
+    r"!\[([^\[\]]*)\]\(([^\(\)]*)\)|(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+)
+DELIMITER_TEXT_TYPES = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+
+
+def extract_markdown_images(text):
+    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+
+
+def extract_markdown_links(text):
+    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
@@ -68,15 +84,47 @@ def split_nodes_link(old_nodes):
 
 
 def text_to_textnodes(text):
-    node = TextNode(text, TextType.TEXT)
-    new_nodes = split_nodes_delimiter([node], "**", TextType.BOLD)
-    new_nodes = split_nodes_delimiter(new_nodes, "_", TextType.ITALIC)
-    new_nodes = split_nodes_delimiter(new_nodes, "`", TextType.CODE)
-    new_nodes = split_nodes_image(new_nodes)
-    new_nodes = split_nodes_link(new_nodes)
-    return new_nodes
+    # One left-to-right scan over the delimiters. Precedence matches splitting on
+    # "**", then "_", then "`": a span only closes on its own delimiter, and a
+    # stronger delimiter inside a weaker open span leaves it unclosed.
+    nodes = []
+    open_delimiter = None
+    start = 0
+    for match in INLINE_DELIMITER_PATTERN.finditer(text):
+        delimiter = match.group()
+        if open_delimiter is None:
+            append_text_and_links(nodes, text, start, match.start())
+            open_delimiter = delimiter
+            start = match.end()
+        elif delimiter == open_delimiter:
+            if match.start() > start:
+                nodes.append(
+                    TextNode(
+                        text[start : match.start()], DELIMITER_TEXT_TYPES[delimiter]
+                    )
+                )
+            open_delimiter = None
+            start = match.end()
+        elif delimiter == "**" or open_delimiter == "`":
+            raise ValueError("invalid markdown, formatted section not closed")
+    if open_delimiter is not None:
+        raise ValueError("invalid markdown, formatted section not closed")
+    append_text_and_links(nodes, text, start, len(text))
+    return nodes
+
+
+def append_text_and_links(nodes, text, start, end):
+    for match in INLINE_LINK_PATTERN.finditer(text, start, end):
+        if match.start() > start:
+            nodes.append(TextNode(text[start : match.start()], TextType.TEXT))
+        if match.group(2) is not None:
+            nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        else:
+            nodes.append(TextNode(match.group(3), TextType.LINK, match.group(4)))
+        start = match.end()
+    if end > start:
+        nodes.append(TextNode(text[start:end], TextType.TEXT))
 
 
 def markdown_to_blocks(markdown):
-    splited = markdown.split("\n\n")
-    return [s.strip() for s in splited]
+    return [block.text for block in lex_markdown(markdown)]
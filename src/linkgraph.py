@@ -0,0 +1,152 @@
+import json
+import os
+from urllib.parse import urljoin, urlsplit
+from xml.sax.saxutils import escape
+
+from statefile import load_state, save_state
+
+LINK_GRAPH_VERSION = 1
+
+
+class SiteIndex:
+    # Facts gathered from each page while it renders, keyed by output path.
+    def __init__(self) -> None:
+        self.pages = {}
+
+    def add(self, dest_path, facts):
+        self.pages[dest_path] = facts.to_json()
+
+    def drain(self):
+        pages, self.pages = self.pages, {}
+        return pages
+
+    def merge(self, pages):
+        self.pages.update(pages)
+
+
+class LinkGraph:
+    def __init__(self, path, pages=None) -> None:
+        self.path = path
+        # page URL -> {"title", "links", "images"}, links as written in source
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        data = load_state(path, LINK_GRAPH_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("pages", {}))
+
+    def update(self, site, dest_dir_path):
+        for dest_path, facts in site.pages.items():
+            self.pages[page_url(dest_path, dest_dir_path)] = {
+                "title": facts["title"],
+                "links": facts["links"],
+                "images": facts["images"],
+            }
+
+    def retain(self, urls):
+        # Pages skipped by an incremental build keep their previous entries;
+        # pages whose source is gone are dropped.
+        pages = self.pages
+        self.pages = {url: pages[url] for url in sorted(urls) if url in pages}
+
+    def outbound(self, url):
+        page = self.pages.get(url, {})
+        return [
+            target
+            for href in page.get("links", [])
+            if (target := resolve_link(url, href)) is not None
+        ]
+
+    def backlinks(self):
+        backlinks = {}
+        for url in self.pages:
+            for target in self.outbound(url):
+                if target != url:
+                    backlinks.setdefault(target, set()).add(url)
+        return {target: sorted(sources) for target, sources in backlinks.items()}
+
+    def backlinks_json(self, context):
+        # docs/backlinks.json: each page URL -> [[linking page URL, title], ...],
+        # for a "linked from" section rendered in the browser.
+        return json.dumps(
+            {
+                context.url(target): [
+                    [context.url(url), self.pages[url]["title"]] for url in sources
+                ]
+                for target, sources in self.backlinks().items()
+            },
+            separators=(",", ":"),
+            sort_keys=True,
+        )
+
+    def broken_links(self, known_urls):
+        broken = []
+        for url, page in self.pages.items():
+            for href in page.get("links", []) + page.get("images", []):
+                target = resolve_link(url, href)
+                if target is not None and target not in known_urls:
+                    broken.append((url, href))
+        return broken
+
+    def sitemap(self, site_url, context):
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for url in sorted(self.pages):
+            location = site_url.rstrip("/") + context.url(url)
+            lines.append(f"  <url><loc>{escape(location)}</loc></url>")
+        lines.append("</urlset>")
+        return "\n".join(lines) + "\n"
+
+    def save(self):
+        save_state(
+            self.path,
+            {"version": LINK_GRAPH_VERSION, "pages": self.pages},
+            indent=1,
+            sort_keys=True,
+        )
+
+
+def print_broken_links(broken):
+    if not broken:
+        return
+    print(f" ! {len(broken)} broken internal links")
+    for url, href in broken:
+        print(f"   {url}: {href}")
+
+
+def page_url(dest_path, dest_dir_path):
+    relative = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if relative == "index.html":
+        return "/"
+    if relative.endswith("/index.html"):
+        return "/" + relative[: -len("index.html")]
+    return "/" + relative
+
+
+def site_urls(dest_paths, dest_dir_path):
+    # Every URL the output tree answers, including "/page/" for "/page.html".
+    urls = set()
+    for dest_path in dest_paths:
+        url = page_url(dest_path, dest_dir_path)
+        urls.add(url)
+        if url.endswith(".html"):
+            urls.add(url[: -len(".html")] + "/")
+    return urls
+
+
+def resolve_link(page, href):
+    # The site path a link points at, or None when it leaves the site or only
+    # moves within the page.
+    parts = urlsplit(href)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = urljoin(page, parts.path)
+    if path.endswith("/index.html"):
+        return path[: -len("index.html")]
+    if not path.endswith("/") and "." not in path.rsplit("/", 1)[-1]:
+        return path + "/"
+    return path
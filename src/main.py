@@ -1,37 +1,165 @@
+import argparse
 import os
-import shutil
 import sys
 
-from copystatic import copy_files_recursive
-from helpers import generate_pages_recursive
+from build import (build, dir_path_cache, load_asset_manifest,
+                   load_image_index)
+from compress import DEFAULT_MIN_SIZE
+from htmlnode import RenderContext
+from copystatic import STRATEGIES
+from profiler import Profiler
+from watch import Watcher
 
-dir_path_static = "./static"
-dir_path_public = "./docs"
-dir_path_content = "./content"
-dir_path_templates = "./templates"
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py")
+    parser.add_argument("basepath", nargs="?")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild outputs whose inputs changed since the last build",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes for page generation (0 = all cores)",
+    )
+    parser.add_argument(
+        "--static-strategy",
+        choices=STRATEGIES,
+        default="copy",
+        help="how static files are placed in the public directory",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and rebuild only what changes",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.05,
+        help="seconds between change polls in watch mode",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="record per-stage and per-page timings and export them",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=64,
+        help="size cap in MiB for the rendered block cache (0 = disabled)",
+    )
+    parser.add_argument(
+        "--in-flight",
+        type=int,
+        default=0,
+        help="overlap page reads, rendering and writes with up to N pages in "
+        "flight (0 = one page at a time)",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz (and .br, with the brotli module) sidecars for HTML and CSS",
+    )
+    parser.add_argument(
+        "--compress-min-size",
+        type=int,
+        default=DEFAULT_MIN_SIZE,
+        help="smallest output in bytes that gets compressed sidecars",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="leave insignificant whitespace out of templates and rendered pages",
+    )
+    parser.add_argument(
+        "--site-url",
+        help="absolute site URL, e.g. https://example.com; enables sitemap.xml",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="write a sharded full-text search index to docs/search/",
+    )
+    parser.add_argument(
+        "--image-dimensions",
+        action="store_true",
+        help="size and lazy-load <img> tags from the image file headers",
+    )
+    parser.add_argument(
+        "--fingerprint-assets",
+        action="store_true",
+        help="publish static files under content-hashed names and link to those",
+    )
+    parser.add_argument(
+        "--backlinks",
+        action="store_true",
+        help="write docs/backlinks.json, the pages linking to each page",
+    )
+    return parser.parse_args(argv)
 
 
 def main():
-    # Check if at least one command line argument is provided
-    if len(sys.argv) <= 1:
+    args = parse_args(sys.argv[1:])
+
+    # Check if the basepath argument is provided
+    if args.basepath is None:
         print("Error: Missing basepath argument")
         print('Usage: python3 main.py "/REPO_NAME/"')
         sys.exit(1)  # Exit with a non-zero status to indicate error
 
-    # If we get here, we have at least one argument
-    basepath = sys.argv[1]
-    print(f"Using basepath: {basepath}")
+    run_build(args)
 
-    print("Deleting public directory...")
-    if os.path.exists(dir_path_public):
-        shutil.rmtree(dir_path_public)
+    if args.watch:
+        images = load_image_index() if args.image_dimensions else None
+        assets = load_asset_manifest() if args.fingerprint_assets else None
+        context = RenderContext(
+            args.basepath, args.minify, args.search_index, images, assets
+        )
+        watcher = Watcher(
+            context,
+            args.static_strategy,
+            compress=args.compress,
+            compress_min_size=args.compress_min_size,
+        )
+        watcher.run(args.watch_interval)
 
-    print("Copying static files to public directory...")
-    copy_files_recursive(dir_path_static, dir_path_public)
 
-    generate_pages_recursive(
-        dir_path_content, dir_path_templates, dir_path_public, basepath
+def run_build(args, warm=None):
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    print(f"Using basepath: {basepath}")
+
+    profiler = Profiler() if args.profile else None
+    build(
+        basepath,
+        incremental=args.incremental or args.watch,
+        jobs=jobs,
+        static_strategy=args.static_strategy,
+        profiler=profiler,
+        block_cache_size=args.block_cache_size * 1024 * 1024,
+        in_flight=args.in_flight,
+        compress=args.compress,
+        compress_min_size=args.compress_min_size,
+        minify=args.minify,
+        site_url=args.site_url,
+        search_index=args.search_index,
+        image_dimensions=args.image_dimensions,
+        fingerprint_assets=args.fingerprint_assets,
+        warm=warm,
+        backlinks=args.backlinks,
     )
+    if profiler is not None:
+        profile_path = os.path.join(dir_path_cache, "profile")
+        profiler.export(profile_path)
+        profiler.print_summary()
+        print(f"Profile written to {profile_path}.json and .trace.json")
 
 
-main()
+if __name__ == "__main__":
+    main()
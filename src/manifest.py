@@ -0,0 +1,126 @@
+import hashlib
+import os
+
+from statefile import load_state, save_state
+
+GENERATOR_VERSION = "1"
+MANIFEST_VERSION = 1
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_source_hash_cache = {}
+
+
+def hash_source(path):
+    # Rehash a page source only when its size or mtime moved; a long-running
+    # build process keeps these between builds.
+    stat = os.stat(path)
+    cached = _source_hash_cache.get(path)
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+    digest = hash_file(path)
+    _source_hash_cache[path] = ((stat.st_mtime_ns, stat.st_size), digest)
+    return digest
+
+
+class Manifest:
+    def __init__(self, path, entries=None) -> None:
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.outputs = {}
+
+    @classmethod
+    def load(cls, path):
+        data = load_state(path, MANIFEST_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("outputs", {}))
+
+    def page_key(self, from_path, template_hash, context):
+        key = {
+            "source": hash_source(from_path),
+            "template": template_hash,
+            "context": context.cache_key(),
+            "version": GENERATOR_VERSION,
+        }
+        if context.images is not None or context.assets is not None:
+            # Resizing an image or editing an asset changes the pages using it.
+            with open(from_path, "r") as file:
+                key["dependencies"] = context.signature(file.read())
+        return key
+
+    def static_key(self, from_path, dest_path, stat=None):
+        # Only rehash a static file when its size or mtime moved since the last build.
+        if stat is None:
+            stat = os.stat(from_path)
+        previous = self.entries.get(dest_path)
+        if (
+            previous is not None
+            and previous.get("size") == stat.st_size
+            and previous.get("mtime") == stat.st_mtime_ns
+        ):
+            return previous
+        return {
+            "source": hash_file(from_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+        }
+
+    def is_fresh(self, dest_path, key):
+        previous = self.entries.get(dest_path)
+        if previous is None or not os.path.exists(dest_path):
+            return False
+        return content_fields(previous) == content_fields(key)
+
+    def record(self, dest_path, key):
+        self.outputs[dest_path] = key
+
+    def prune(self, dest_dir_path):
+        for dest_path in self.entries:
+            if dest_path in self.outputs or not os.path.exists(dest_path):
+                continue
+            print(f" - removing {dest_path}")
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), dest_dir_path)
+
+    def remove_untracked(self, dest_dir_path):
+        # Full builds own the whole output tree, like the rmtree they replaced.
+        outputs = {os.path.normpath(path) for path in self.outputs}
+        for dir_path, _, file_names in os.walk(dest_dir_path, topdown=False):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                if os.path.normpath(path) not in outputs:
+                    print(f" - removing {path}")
+                    os.remove(path)
+            if dir_path != dest_dir_path and not os.listdir(dir_path):
+                os.rmdir(dir_path)
+
+    def save(self):
+        save_state(
+            self.path,
+            {"version": MANIFEST_VERSION, "outputs": self.outputs},
+            indent=1,
+            sort_keys=True,
+        )
+
+
+def content_fields(key):
+    # size and mtime only decide whether to rehash; they never force a rebuild.
+    return {k: v for k, v in key.items() if k not in ("size", "mtime")}
+
+
+def remove_empty_dirs(dir_path, root_path):
+    root_path = os.path.abspath(root_path)
+    dir_path = os.path.abspath(dir_path)
+    while dir_path != root_path and dir_path.startswith(root_path + os.sep):
+        if os.listdir(dir_path):
+            return
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
@@ -0,0 +1,79 @@
+import os
+import threading
+from contextlib import contextmanager
+
+from manifest import hash_file
+
+
+class OutputWriter:
+    def __init__(self) -> None:
+        # Pipelined builds write from several threads.
+        self.lock = threading.Lock()
+        self.created_dirs = set()
+        self.changed = []
+        self.unchanged = 0
+
+    def make_dirs(self, dir_path):
+        if dir_path and dir_path not in self.created_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            self.created_dirs.add(dir_path)
+
+    @contextmanager
+    def open(self, dest_path):
+        # Everything goes to a temporary file next to the output, which only
+        # replaces it when the content differs. Readers never see a partial
+        # page and an identical page keeps its mtime.
+        directory = os.path.dirname(dest_path)
+        self.make_dirs(directory)
+        name = os.path.basename(dest_path)
+        temp_path = os.path.join(
+            directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            with open(temp_path, "w") as file:
+                yield file
+            if is_same_file(temp_path, dest_path):
+                os.remove(temp_path)
+                with self.lock:
+                    self.unchanged += 1
+            else:
+                os.replace(temp_path, dest_path)
+                with self.lock:
+                    self.changed.append(dest_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def write(self, dest_path, content):
+        with self.open(dest_path) as file:
+            file.write(content)
+
+    def drain(self):
+        with self.lock:
+            changed, self.changed = self.changed, []
+            unchanged, self.unchanged = self.unchanged, 0
+        return changed, unchanged
+
+    def merge(self, updates):
+        changed, unchanged = updates
+        self.changed.extend(changed)
+        self.unchanged += unchanged
+
+
+def is_same_file(path, other_path):
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+    except FileNotFoundError:
+        return False
+    return hash_file(path) == hash_file(other_path)
+
+
+def save_changed_list(path, changed):
+    # One path per line, for deploy tools that upload only what changed.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        file.writelines(f"{dest_path}\n" for dest_path in sorted(changed))
@@ -0,0 +1,151 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from block_lexer import lex_markdown
+from document import PageFacts, PageStream, page_values
+from htmlnode import RenderContext
+from output import OutputWriter
+from profiler import profile_stage
+
+DEFAULT_IN_FLIGHT = 8
+
+# Queue sentinel marking the end of a stage's input.
+DONE = None
+
+
+def read_page(from_path, profiler=None):
+    with profile_stage(profiler, "read", from_path):
+        with open(from_path, "r") as file:
+            return file.read()
+
+
+def render_page(
+    markdown, template, context, block_cache=None, from_path=None, profiler=None
+):
+    with profile_stage(profiler, "render", from_path):
+        page = PageStream(lex_markdown(markdown))
+        facts = PageFacts(page.title)
+        content = "".join(page.iter_html(context, block_cache, facts))
+        return template.render(page_values(page.title, content, context)), facts
+
+
+def write_page(writer, from_path, dest_path, html, profiler=None):
+    with profile_stage(profiler, "write", from_path):
+        writer.write(dest_path, html)
+
+
+async def generate_pages_async(
+    pages,
+    templates,
+    context,
+    in_flight=DEFAULT_IN_FLIGHT,
+    profiler=None,
+    block_cache=None,
+    writer=None,
+    site=None,
+):
+    # Readers and writers run on an I/O thread pool so slow storage overlaps
+    # with rendering. Rendering stays on one thread: it is CPU bound and the
+    # block cache isn't shared between threads. A page holds one of the
+    # in_flight slots from its read until its write, which bounds memory.
+    # pages are (source, destination, layout), with layouts from templates.
+    loop = asyncio.get_running_loop()
+    context = RenderContext.of(context)
+    slots = asyncio.Semaphore(in_flight)
+    render_queue = asyncio.Queue(in_flight)
+    write_queue = asyncio.Queue(in_flight)
+    if writer is None:
+        writer = OutputWriter()
+    errors = []
+
+    def fail(from_path, error):
+        errors.append((from_path, f"{type(error).__name__}: {error}"))
+        slots.release()
+
+    async def read(from_path, dest_path, layout):
+        try:
+            markdown = await loop.run_in_executor(
+                io_pool, read_page, from_path, profiler
+            )
+        except Exception as e:
+            fail(from_path, e)
+            return
+        await render_queue.put((from_path, dest_path, layout, markdown))
+
+    async def read_all():
+        tasks = []
+        for from_path, dest_path, layout in pages:
+            await slots.acquire()
+            tasks.append(asyncio.create_task(read(from_path, dest_path, layout)))
+        await asyncio.gather(*tasks)
+        await render_queue.put(DONE)
+
+    async def render_all():
+        while (item := await render_queue.get()) is not DONE:
+            from_path, dest_path, layout, markdown = item
+            print(
+                f"Generating page from {from_path} to {dest_path} "
+                f"using {templates.paths[layout]}"
+            )
+            try:
+                html, facts = await loop.run_in_executor(
+                    render_pool,
+                    render_page,
+                    markdown,
+                    templates.get(layout),
+                    context,
+                    block_cache,
+                    from_path,
+                    profiler,
+                )
+            except Exception as e:
+                fail(from_path, e)
+                continue
+            await write_queue.put((from_path, dest_path, html, facts))
+        for _ in range(in_flight):
+            await write_queue.put(DONE)
+
+    async def write_all():
+        while (item := await write_queue.get()) is not DONE:
+            from_path, dest_path, html, facts = item
+            try:
+                await loop.run_in_executor(
+                    io_pool, write_page, writer, from_path, dest_path, html, profiler
+                )
+            except Exception as e:
+                fail(from_path, e)
+                continue
+            if site is not None:
+                site.add(dest_path, facts)
+            slots.release()
+
+    io_pool = ThreadPoolExecutor(in_flight)
+    render_pool = ThreadPoolExecutor(1)
+    with io_pool, render_pool:
+        writers = [write_all() for _ in range(in_flight)]
+        await asyncio.gather(read_all(), render_all(), *writers)
+    return errors
+
+
+def generate_pages_pipelined(
+    pages,
+    templates,
+    context,
+    in_flight=DEFAULT_IN_FLIGHT,
+    profiler=None,
+    block_cache=None,
+    writer=None,
+    site=None,
+):
+    return asyncio.run(
+        generate_pages_async(
+            pages,
+            templates,
+            context,
+            in_flight,
+            profiler,
+            block_cache,
+            writer,
+            site,
+        )
+    )
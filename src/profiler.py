@@ -0,0 +1,107 @@
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.events = []
+
+    @contextmanager
+    def stage(self, name, page=None):
+        # CPU time is the calling thread's, so a stage must be profiled in the
+        # thread doing its work; pipelined pages render and write concurrently.
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.events.append(
+                {
+                    "name": name,
+                    "page": page,
+                    "start": wall_start,
+                    "wall": time.perf_counter() - wall_start,
+                    "cpu": time.thread_time() - cpu_start,
+                    "pid": os.getpid(),
+                }
+            )
+
+    def merge(self, events):
+        self.events.extend(events)
+
+    def drain(self):
+        events, self.events = self.events, []
+        return events
+
+    def stage_totals(self):
+        totals = {}
+        for event in self.events:
+            total = totals.setdefault(event["name"], {"wall": 0.0, "cpu": 0.0})
+            total["wall"] += event["wall"]
+            total["cpu"] += event["cpu"]
+        return totals
+
+    def page_totals(self):
+        pages = {}
+        for event in self.events:
+            if event["page"] is None:
+                continue
+            page = pages.setdefault(event["page"], {"wall": 0.0, "cpu": 0.0})
+            page.setdefault("stages", {})[event["name"]] = event["wall"]
+            page["wall"] += event["wall"]
+            page["cpu"] += event["cpu"]
+        return pages
+
+    def slowest_pages(self, limit=20):
+        pages = self.page_totals().items()
+        return sorted(pages, key=lambda item: item[1]["wall"], reverse=True)[:limit]
+
+    def to_json(self):
+        return {"stages": self.stage_totals(), "pages": self.page_totals()}
+
+    def to_trace_events(self):
+        # Chrome trace-event format; load it in chrome://tracing or Perfetto.
+        origin = min((event["start"] for event in self.events), default=0.0)
+        return {
+            "traceEvents": [
+                {
+                    "name": event["name"],
+                    "cat": "build",
+                    "ph": "X",
+                    "ts": (event["start"] - origin) * 1e6,
+                    "dur": event["wall"] * 1e6,
+                    "pid": event["pid"],
+                    "tid": event["pid"],
+                    "args": {"page": event["page"], "cpu_ms": event["cpu"] * 1000},
+                }
+                for event in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def export(self, path_prefix):
+        directory = os.path.dirname(path_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path_prefix + ".json", "w") as file:
+            json.dump(self.to_json(), file, indent=1)
+        with open(path_prefix + ".trace.json", "w") as file:
+            json.dump(self.to_trace_events(), file)
+
+    def print_summary(self, limit=20):
+        print("Stage                wall (ms)    cpu (ms)")
+        for name, total in self.stage_totals().items():
+            wall_ms = total["wall"] * 1000
+            cpu_ms = total["cpu"] * 1000
+            print(f"{name:<18} {wall_ms:>11.1f} {cpu_ms:>11.1f}")
+        print(f"Slowest {limit} pages:")
+        for page, total in self.slowest_pages(limit):
+            print(f"{total['wall'] * 1000:>9.1f} ms  {page}")
+
+
+def profile_stage(profiler, name, page=None):
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name, page)
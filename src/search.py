@@ -0,0 +1,139 @@
+import json
+import os
+from collections import Counter
+
+from document import TERM_PATTERN
+from linkgraph import page_url
+from statefile import load_state, save_state
+
+SEARCH_INDEX_VERSION = 1
+# Shards hold every term starting with the same two characters, so a browser
+# fetches one small file per query term instead of the whole index.
+PREFIX_LENGTH = 2
+TITLE_WEIGHT = 5
+
+
+def term_prefix(term):
+    return term[:PREFIX_LENGTH]
+
+
+def page_terms(facts):
+    # Term -> weight for one page: occurrences in its prose, with words in
+    # the title counting extra.
+    terms = Counter(facts["terms"])
+    if facts["title"]:
+        for term in set(TERM_PATTERN.findall(facts["title"].lower())):
+            if term in terms:
+                terms[term] += TITLE_WEIGHT
+    return dict(terms)
+
+
+class SearchIndex:
+    def __init__(self, path, pages=None) -> None:
+        self.path = path
+        # page URL -> {"id", "title", "terms": {term: weight}}
+        self.pages = pages if pages is not None else {}
+        # prefix -> {term: {page id: weight}}, rebuilt from the pages so only
+        # the forward index is persisted.
+        self.shards = {}
+        # Shards touched since the last write.
+        self.dirty = set()
+        for page in self.pages.values():
+            for term, weight in page["terms"].items():
+                self.post(term, str(page["id"]), weight)
+        self.dirty.clear()
+
+    @classmethod
+    def load(cls, path):
+        data = load_state(path, SEARCH_INDEX_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("pages", {}))
+
+    def update(self, site, dest_dir_path):
+        # Only pages rendered in this build are in the site index, and of
+        # those only the terms whose weight changed touch any shard.
+        for dest_path, facts in sorted(site.pages.items()):
+            url = page_url(dest_path, dest_dir_path)
+            terms = page_terms(facts)
+            previous = self.pages.get(url)
+            if previous is None:
+                page = {"id": self.next_id(), "title": facts["title"], "terms": {}}
+                self.pages[url] = page
+            else:
+                page = previous
+                page["title"] = facts["title"]
+            old_terms, page["terms"] = page["terms"], terms
+            page_id = str(page["id"])
+            for term, weight in old_terms.items():
+                if terms.get(term) != weight:
+                    self.unpost(term, page_id)
+            for term, weight in terms.items():
+                if old_terms.get(term) != weight:
+                    self.post(term, page_id, weight)
+
+    def retain(self, urls):
+        urls = set(urls)
+        for url in [url for url in self.pages if url not in urls]:
+            page = self.pages.pop(url)
+            for term in page["terms"]:
+                self.unpost(term, str(page["id"]))
+
+    def next_id(self):
+        return max((page["id"] for page in self.pages.values()), default=-1) + 1
+
+    def post(self, term, page_id, weight):
+        prefix = term_prefix(term)
+        self.shards.setdefault(prefix, {}).setdefault(term, {})[page_id] = weight
+        self.dirty.add(prefix)
+
+    def unpost(self, term, page_id):
+        prefix = term_prefix(term)
+        shard = self.shards[prefix]
+        postings = shard[term]
+        del postings[page_id]
+        if not postings:
+            del shard[term]
+        if not shard:
+            del self.shards[prefix]
+        self.dirty.add(prefix)
+
+    def write(self, search_dir_path, writer, manifest, context):
+        # pages.json maps ids to URLs and titles; <prefix>.json maps each term
+        # to [[page id, weight], ...]. Untouched shards are left alone but
+        # still recorded, so only shards that vanished get pruned.
+        pages = sorted(
+            [page["id"], context.url(url), page["title"]]
+            for url, page in self.pages.items()
+        )
+        pages_path = os.path.join(search_dir_path, "pages.json")
+        writer.write(pages_path, dump_compact(pages))
+        manifest.record(pages_path, {"generated": "search"})
+        written = 0
+        for prefix, shard in self.shards.items():
+            shard_path = os.path.join(search_dir_path, f"{prefix}.json")
+            if prefix in self.dirty or not os.path.exists(shard_path):
+                writer.write(shard_path, dump_shard(shard))
+                written += 1
+            manifest.record(shard_path, {"generated": "search"})
+        self.dirty = set()
+        print(
+            f" * search index: {len(self.pages)} pages, "
+            f"{written} of {len(self.shards)} shards written"
+        )
+
+    def save(self):
+        save_state(self.path, {"version": SEARCH_INDEX_VERSION, "pages": self.pages})
+
+
+def dump_shard(shard):
+    return dump_compact(
+        {
+            term: sorted([int(page_id), weight] for page_id, weight in postings.items())
+            for term, postings in shard.items()
+        }
+    )
+
+
+def dump_compact(value):
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
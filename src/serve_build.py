@@ -0,0 +1,92 @@
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+
+from build_client import DEFAULT_SOCKET_PATH, STATUS_MARKER
+from main import parse_args, run_build
+
+
+def serve(socket_path=DEFAULT_SOCKET_PATH):
+    # One build at a time, in this process, so the block cache, image index,
+    # compiled templates and source hashes stay loaded between builds.
+    if os.path.exists(socket_path):
+        if is_listening(socket_path):
+            raise ValueError(f"a build daemon is already listening on {socket_path}")
+        os.unlink(socket_path)
+    directory = os.path.dirname(socket_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    print(f"Serving builds on {socket_path}")
+    # Exit through the cleanup below when stopped with kill, too.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    warm = {}
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                handle_request(connection, warm)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.unlink(socket_path)
+
+
+def handle_request(connection, warm):
+    stream = connection.makefile("rw", encoding="utf-8", newline="\n")
+    try:
+        line = stream.readline()
+        if not line:
+            # A liveness probe from is_listening.
+            return
+        request = json.loads(line)
+        with redirect_stdout(stream), redirect_stderr(stream):
+            status = run_request(request.get("args", []), warm)
+        stream.write(STATUS_MARKER + json.dumps({"status": status}) + "\n")
+        stream.flush()
+    except (OSError, ValueError) as e:
+        # The client went away or sent garbage; the daemon keeps serving.
+        print(f" ! dropped build request: {e}")
+    finally:
+        stream.close()
+
+
+def run_request(argv, warm):
+    try:
+        args = parse_args(argv)
+    except SystemExit as e:
+        return e.code or 0
+    if args.basepath is None:
+        print("Error: Missing basepath argument")
+        return 1
+    if args.watch:
+        print("Error: --watch is not supported by the build daemon")
+        return 1
+    try:
+        run_build(args, warm)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def is_listening(socket_path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOCKET_PATH)
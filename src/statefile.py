@@ -0,0 +1,35 @@
+import json
+import os
+
+
+def load_state(path, version):
+    # The data saved at path, or None when there is none to trust: missing,
+    # from another format version, or cut short by an interrupted save.
+    try:
+        with open(path, "r") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f" ! ignoring unreadable {path}: {e}")
+        return None
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data
+
+
+def save_state(path, data, indent=None, sort_keys=False):
+    # Written to a temporary file and swapped in, so an interrupted save
+    # leaves the previous build's state in place.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w") as file:
+            json.dump(data, file, indent=indent, sort_keys=sort_keys)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
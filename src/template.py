@@ -0,0 +1,173 @@
+import hashlib
+import os
+import re
+
+# "{{ Name }}" placeholders, plus the root-relative href/src URLs, which are
+# rewritten per render for the basepath and fingerprinted asset names.
+SLOT_PATTERN = re.compile(
+    r'\{\{ (\w+) \}\}|(?<=href=")/(?!/)[^"]*|(?<=src=")/(?!/)[^"]*'
+)
+URL_SLOT = "url"
+# "{{> name }}" pulls in templates/name.html, e.g. "{{> partials/header }}".
+INCLUDE_PATTERN = re.compile(r"\{\{> ([\w./-]+) \}\}")
+TEMPLATE_EXTENSION = ".html"
+DEFAULT_LAYOUT = "template"
+
+# Elements whose content is whitespace-sensitive and kept verbatim.
+PRESERVED_PATTERN = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.DOTALL | re.IGNORECASE
+)
+# Whitespace next to block-level and head tags never renders.
+BLOCK_TAG_WHITESPACE_PATTERN = re.compile(
+    r"\s*(<(?:!doctype|/?(?:html|head|body|meta|title|link|base|article|section|"
+    r"header|footer|main|nav|aside|div|p|h[1-6]|ul|ol|li|pre|blockquote|table|"
+    r"thead|tbody|tr|th|td|hr|br|form|figure|figcaption)\b)[^>]*>)\s*",
+    re.IGNORECASE,
+)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+_template_cache = {}
+_registry_cache = {}
+
+
+class Template:
+    def __init__(self, parts, slots) -> None:
+        self.parts = parts
+        self.slots = slots
+        self.slot_names = dict(slots)
+
+    def render(self, values):
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            value = values.get(name)
+            if value is None:
+                continue
+            if name == URL_SLOT:
+                # The URL slot's value rewrites the URL written in the template.
+                value = value(parts[index])
+            parts[index] = value
+        return "".join(parts)
+
+    def render_into(self, writer, values):
+        # Slot values may be strings or iterables of chunks, which are streamed
+        # straight into the writer without being joined first.
+        for index, part in enumerate(self.parts):
+            name = self.slot_names.get(index)
+            value = values.get(name) if name is not None else None
+            if value is None:
+                writer.write(part)
+            elif name == URL_SLOT:
+                writer.write(value(part))
+            elif isinstance(value, str):
+                writer.write(value)
+            else:
+                writer.writelines(value)
+
+    def urls(self):
+        return [self.parts[index] for index, name in self.slots if name == URL_SLOT]
+
+    def __repr__(self) -> str:
+        return f"Template({self.parts}, {self.slots})"
+
+
+def minify_html(text):
+    pieces = PRESERVED_PATTERN.split(text)
+    minified = []
+    # split() yields text, then the preserved element and its tag name.
+    for index in range(0, len(pieces), 3):
+        piece = BLOCK_TAG_WHITESPACE_PATTERN.sub(r"\1", pieces[index])
+        minified.append(WHITESPACE_PATTERN.sub(" ", piece))
+        if index + 1 < len(pieces):
+            minified.append(pieces[index + 1])
+    return "".join(minified).strip()
+
+
+def compile_template(text, minify=False):
+    if minify:
+        text = minify_html(text)
+    parts = []
+    slots = []
+    position = 0
+    for match in SLOT_PATTERN.finditer(text):
+        if match.start() > position:
+            parts.append(text[position : match.start()])
+        name = match.group(1) or URL_SLOT
+        # Keep the original text so unknown placeholders render unchanged.
+        slots.append((len(parts), name))
+        parts.append(match.group(0))
+        position = match.end()
+    if position < len(text):
+        parts.append(text[position:])
+    return Template(parts, slots)
+
+
+class TemplateRegistry:
+    # Every template under the templates directory, with includes inlined and
+    # compiled once, so picking a page's layout is a dictionary lookup.
+    def __init__(self, dir_path, sources, minify=False) -> None:
+        self.dir_path = dir_path
+        self.paths = {
+            name: os.path.join(dir_path, name + TEMPLATE_EXTENSION) for name in sources
+        }
+        self.templates = {
+            name: compile_template(expand_includes(name, sources), minify)
+            for name in sources
+        }
+        digest = hashlib.sha256()
+        for name in sorted(sources):
+            digest.update(f"{name}\0{sources[name]}\0".encode())
+        self.digest = digest.hexdigest()
+
+    @classmethod
+    def load(cls, dir_path, minify=False):
+        # Recompile only when a template was added, removed or touched; a
+        # long-running build process keeps the registry between builds.
+        stats = []
+        for root, _, files in os.walk(dir_path):
+            for file in files:
+                if file.endswith(TEMPLATE_EXTENSION):
+                    path = os.path.join(root, file)
+                    stat = os.stat(path)
+                    stats.append((path, stat.st_mtime_ns, stat.st_size))
+        stats.sort()
+        cached = _registry_cache.get((dir_path, minify))
+        if cached is not None and cached[0] == stats:
+            return cached[1]
+        sources = {}
+        for path, _, _ in stats:
+            name = os.path.relpath(path, dir_path)[: -len(TEMPLATE_EXTENSION)]
+            with open(path, "r") as template_file:
+                sources[name.replace(os.sep, "/")] = template_file.read()
+        registry = cls(dir_path, sources, minify)
+        _registry_cache[(dir_path, minify)] = (stats, registry)
+        return registry
+
+    def get(self, name):
+        template = self.templates.get(name)
+        if template is None:
+            raise ValueError(f"unknown layout: {name}")
+        return template
+
+
+def expand_includes(name, sources, including=()):
+    if name in including:
+        cycle = " -> ".join(including + (name,))
+        raise ValueError(f"template include cycle: {cycle}")
+    if name not in sources:
+        raise ValueError(f"unknown template include: {name}")
+
+    def include(match):
+        return expand_includes(match.group(1), sources, including + (name,))
+
+    return INCLUDE_PATTERN.sub(include, sources[name])
+
+
+def load_template(path, minify=False):
+    stat = os.stat(path)
+    cached = _template_cache.get((path, minify))
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+    with open(path, "r") as file:
+        template = compile_template(file.read(), minify)
+    _template_cache[(path, minify)] = ((stat.st_mtime_ns, stat.st_size), template)
+    return template
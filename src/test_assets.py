@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetManifest, fingerprint_static_files, fingerprinted_name
+from block_cache import block_key
+from block_lexer import lex_markdown
+from copystatic import sync_static_files
+from htmlnode import LeafNode, RenderContext
+from manifest import Manifest
+from template import compile_template
+from test_generate import write
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "docs")
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self):
+        manifest = Manifest.load(self.manifest_path)
+        sync_static_files(self.static, self.public, manifest)
+        assets = AssetManifest(os.path.join(self.tmp.name, "assets.json"))
+        written = fingerprint_static_files(self.static, self.public, manifest, assets)
+        manifest.prune(self.public)
+        manifest.save()
+        return assets, written
+
+    def test_copies_under_content_hash(self):
+        assets, written = self.build()
+        css = assets.assets["/index.css"]
+        self.assertRegex(css, r"^/index\.[0-9a-f]{10}\.css$")
+        self.assertRegex(assets.assets["/images/a.png"], r"^/images/a\.[0-9a-f]+\.png$")
+        self.assertEqual(2, len(written))
+        with open(os.path.join(self.public, css[1:])) as file:
+            self.assertEqual("body {}", file.read())
+        # The plain names stay published for links from outside the site.
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css")))
+
+    def test_changed_asset_gets_new_name(self):
+        first, _ = self.build()
+        self.assertEqual([], self.build()[1])
+        write(os.path.join(self.static, "index.css"), "body { color: red }")
+        second, written = self.build()
+        self.assertNotEqual(first.assets["/index.css"], second.assets["/index.css"])
+        new_path = os.path.join(self.public, second.assets["/index.css"][1:])
+        self.assertEqual([new_path], written)
+        old_path = os.path.join(self.public, first.assets["/index.css"][1:])
+        self.assertFalse(os.path.exists(old_path))
+
+    def test_render_rewrites_urls(self):
+        assets = AssetManifest(
+            "", {"/index.css": "/index.abc.css", "/a.png": "/a.1.png"}
+        )
+        context = RenderContext("/ssg/", assets=assets)
+        self.assertEqual("/ssg/index.abc.css?v=1#x", context.url("/index.css?v=1#x"))
+        self.assertEqual("/ssg/blog/", context.url("/blog/"))
+        node = LeafNode("img", "", {"src": "/a.png", "alt": ""})
+        self.assertEqual('<img src="/ssg/a.1.png" alt=""></img>', node.to_html(context))
+        template = compile_template('<link href="/index.css">')
+        self.assertEqual(
+            '<link href="/ssg/index.abc.css">', template.render({"url": context.url})
+        )
+
+    def test_headers(self):
+        assets = AssetManifest("", {"/index.css": "/index.abc.css"})
+        self.assertEqual(
+            "/ssg/index.abc.css\n"
+            "  Cache-Control: public, max-age=31536000, immutable\n",
+            assets.headers(RenderContext("/ssg/")),
+        )
+
+    def test_block_key_follows_linked_assets(self):
+        (block,) = lex_markdown("[sheet](/index.css)")
+        first = RenderContext("/", assets=AssetManifest("", {"/index.css": "/a.css"}))
+        second = RenderContext("/", assets=AssetManifest("", {"/index.css": "/b.css"}))
+        self.assertNotEqual(block_key(block, first), block_key(block, second))
+        (plain,) = lex_markdown("no links here")
+        self.assertEqual(block_key(plain, first), block_key(plain, second))
+
+    def test_fingerprinted_name(self):
+        digest = "0123456789abcdef"
+        self.assertEqual("a.0123456789.css", fingerprinted_name("a.css", digest))
+        self.assertEqual("LICENSE.0123456789", fingerprinted_name("LICENSE", digest))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import blocks
+from bench import compare_results, generate_corpus, parse_mix, run_once
+from block_lexer import lex_markdown
+from blocks import BlockType
+from document import PageStream
+
+
+class TestBench(unittest.TestCase):
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(
+            generate_corpus(3, 10, seed=1), generate_corpus(3, 10, seed=1)
+        )
+        self.assertNotEqual(
+            generate_corpus(3, 10, seed=1), generate_corpus(3, 10, seed=2)
+        )
+
+    def test_corpus_pages_parse(self):
+        for page, markdown in enumerate(generate_corpus(5, 40)):
+            document = PageStream(lex_markdown(markdown))
+            self.assertEqual(f"Page {page}", document.title)
+            self.assertEqual(41, len(list(document.blocks)))
+
+    def test_corpus_mix(self):
+        markdown = generate_corpus(1, 10, {"code": 1})[0]
+        block_types = [block.block_type for block in lex_markdown(markdown)]
+        self.assertEqual([BlockType.CODE] * 10, block_types[1:])
+
+    def test_node_stage_reuses_tokenized_text(self):
+        corpus = generate_corpus(2, 20)
+        with tempfile.TemporaryDirectory() as out_dir:
+            with mock.patch.object(
+                blocks, "text_to_textnodes", side_effect=AssertionError
+            ):
+                timings = run_once(corpus, out_dir)
+        self.assertGreater(timings["block_to_html_node"], 0)
+
+    def test_parse_mix(self):
+        self.assertEqual({"code": 2.0, "quote": 1.0}, parse_mix("code=2,quote"))
+
+    def test_compare_results(self):
+        baseline = {
+            "stages": {"to_html": {"seconds": 1.0}, "file_io": {"seconds": 1.0}}
+        }
+        results = {
+            "stages": {"to_html": {"seconds": 1.05}, "file_io": {"seconds": 1.5}}
+        }
+        self.assertEqual([("file_io", 1.5)], compare_results(results, baseline, 0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from block_cache import BlockCache, block_key
+from block_lexer import lex_markdown
+from blocks import typed_block_to_html_node
+from htmlnode import RenderContext
+
+
+def lex(markdown):
+    return list(lex_markdown(markdown))
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "blocks.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_matches_uncached_and_counts_hits(self):
+        cache = BlockCache(self.path)
+        context = RenderContext("/base/")
+        blocks = lex("[home](/)\n\n- a\n- b\n\n[home](/)")
+        rendered = [cache.render(block, context)[0] for block in blocks]
+        self.assertEqual(
+            [typed_block_to_html_node(block).to_html(context) for block in blocks],
+            rendered,
+        )
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_hits_return_block_facts(self):
+        cache = BlockCache(self.path)
+        block = lex("[home](/) and ![logo](/logo.png)")[0]
+        facts = {"links": ["/"], "images": ["/logo.png"], "terms": ["home", "and"]}
+        self.assertEqual(facts, cache.render(block, RenderContext("/b/", search=True))[1])
+        self.assertEqual(facts, cache.render(block, RenderContext("/b/", search=True))[1])
+        self.assertEqual(1, cache.hits)
+
+    def test_key_depends_on_render_context(self):
+        block = lex("[home](/)")[0]
+        first = block_key(block, RenderContext("/a/"))
+        self.assertNotEqual(first, block_key(block, RenderContext("/b/")))
+
+    def test_save_and_load(self):
+        cache = BlockCache(self.path)
+        block = lex("some **text**")[0]
+        cache.render(block)
+        cache.save()
+        loaded = BlockCache.load(self.path)
+        self.assertEqual("<p>some <b>text</b></p>", loaded.render(block)[0])
+        self.assertEqual((1, 0), (loaded.hits, loaded.misses))
+
+    def test_corrupt_cache_loads_cold(self):
+        with open(self.path, "w") as file:
+            file.write('{"version": 3, "entries": {"ab')
+        cache = BlockCache.load(self.path, max_bytes=100)
+        self.assertEqual(({}, 100), (cache.entries, cache.max_bytes))
+
+    def test_evicts_least_recently_used(self):
+        first, second, third = lex("first\n\nsecond\n\nthird")
+        cache = BlockCache(self.path)
+        for block in (first, second, first):
+            cache.render(block)
+        cache.max_bytes = cache.size
+        cache.render(third)
+        self.assertNotIn(block_key(second), cache.entries)
+        self.assertNotIn(block_key(second), cache.added)
+        self.assertIn(block_key(first), cache.entries)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+
+    def test_size_stays_under_cap_while_rendering(self):
+        blocks = lex("\n\n".join(f"paragraph {i} " * 20 for i in range(50)))
+        cache = BlockCache(self.path, max_bytes=2000)
+        for block in blocks:
+            cache.render(block)
+            self.assertLessEqual(cache.size, cache.max_bytes)
+        self.assertLess(len(cache.entries), len(blocks))
+        self.assertLess(len(cache.added), len(blocks))
+
+    def test_merge_worker_updates(self):
+        first, second = lex("first\n\nsecond")
+        parent = BlockCache(self.path)
+        parent.render(first)
+        worker = BlockCache(self.path, dict(parent.entries))
+        worker.render(first)
+        worker.render(second)
+        parent.merge(worker.drain())
+        self.assertEqual((1, 2), (parent.hits, parent.misses))
+        self.assertEqual([block_key(first), block_key(second)], list(parent.entries))
+
+
+if __name__ == "__main__":
+    unittest.main()
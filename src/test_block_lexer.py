@@ -0,0 +1,73 @@
+import io
+import unittest
+
+from block_lexer import BlockType, lex_chunks, lex_file, lex_markdown
+
+
+class TestBlockLexer(unittest.TestCase):
+    def test_matches_split_on_blank_lines(self):
+        md = "# Title\n\n\n\nparagraph\nline\n\n  - a\n- b  \n\n"
+        self.assertEqual(
+            [block.strip() for block in md.split("\n\n")],
+            [block.text for block in lex_markdown(md)],
+        )
+
+    def test_block_types_and_items(self):
+        md = "# Title\n\n> a\n> b\n\n- x\n- y\n\n1. one\n2. two\n\ntext\nmore"
+        blocks = list(lex_markdown(md))
+        self.assertEqual(
+            [
+                BlockType.HEADING,
+                BlockType.QUOTE,
+                BlockType.UNORDERED_LIST,
+                BlockType.ORDERED_LIST,
+                BlockType.PARAGRAPH,
+            ],
+            [block.block_type for block in blocks],
+        )
+        self.assertEqual(
+            [[], ["a b"], ["x", "y"], ["one", "two"], ["text more"]],
+            [block.items for block in blocks],
+        )
+
+    def test_ordered_list_must_count_from_one(self):
+        blocks = list(lex_markdown("1. a\n3. b"))
+        self.assertEqual(BlockType.PARAGRAPH, blocks[0].block_type)
+
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "```\nfirst\n\nsecond\n```\n\nafter"
+        blocks = list(lex_markdown(md))
+        self.assertEqual(
+            ["```\nfirst\n\nsecond\n```", "after"], [block.text for block in blocks]
+        )
+        self.assertEqual(BlockType.CODE, blocks[0].block_type)
+
+    def test_unclosed_fence_does_not_swallow_document(self):
+        md = "```\ncode\n\nparagraph"
+        self.assertEqual(
+            ["```\ncode", "paragraph"], [block.text for block in lex_markdown(md)]
+        )
+
+    def test_line_ranges(self):
+        md = "# Title\n\nline one\nline two\n\n```\na\n\nb\n```"
+        self.assertEqual(
+            [(0, 1), (2, 4), (5, 10)],
+            [(block.start, block.end) for block in lex_markdown(md)],
+        )
+
+    def test_chunked_input_matches_whole_input(self):
+        md = "# Title\n\n```\na\n\nb\n```\n\n- x\n- y\n\ntext **bold**\n\n> q"
+        whole = list(lex_markdown(md))
+        for size in (1, 2, 3, 7):
+            chunks = [md[i : i + size] for i in range(0, len(md), size)]
+            self.assertEqual(whole, list(lex_chunks(chunks)))
+
+    def test_lex_file_reads_in_chunks(self):
+        md = "# Title\n\n" + "".join(f"para {i}\n\n" for i in range(50))
+        self.assertEqual(
+            list(lex_markdown(md)), list(lex_file(io.StringIO(md), chunk_size=5))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
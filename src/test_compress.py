@@ -0,0 +1,65 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import brotli, compress_outputs
+from manifest import Manifest
+from test_generate import write
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "docs")
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        self.page = os.path.join(self.public, "index.html")
+        write(self.page, "<p>hello</p>" * 200)
+        write(os.path.join(self.public, "small.css"), "body {}")
+        write(os.path.join(self.public, "image.png"), "x" * 4096)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self):
+        manifest = Manifest.load(self.manifest_path)
+        for name in os.listdir(self.public):
+            if not name.endswith((".gz", ".br")):
+                manifest.record(os.path.join(self.public, name), {})
+        written = compress_outputs(manifest, formats=("gzip",))
+        manifest.prune(self.public)
+        manifest.save()
+        return written
+
+    def test_writes_sidecars_above_threshold(self):
+        self.assertEqual([self.page + ".gz"], self.build())
+        with gzip.open(self.page + ".gz", "rt") as file:
+            self.assertEqual("<p>hello</p>" * 200, file.read())
+        self.assertFalse(os.path.exists(os.path.join(self.public, "small.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "image.png.gz")))
+
+    def test_skips_unchanged_outputs(self):
+        self.build()
+        self.assertEqual([], self.build())
+        write(self.page, "<p>changed</p>" * 200)
+        self.assertEqual([self.page + ".gz"], self.build())
+
+    def test_prunes_sidecar_of_shrunk_output(self):
+        self.build()
+        write(self.page, "<p>short</p>")
+        self.build()
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_sidecar(self):
+        manifest = Manifest(self.manifest_path)
+        manifest.record(self.page, {})
+        compress_outputs(manifest, formats=("gzip", "brotli"))
+        with open(self.page + ".br", "rb") as file:
+            self.assertEqual(
+                "<p>hello</p>" * 200, brotli.decompress(file.read()).decode()
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from copystatic import sync_static_files
+from manifest import Manifest
+from test_generate import write
+
+
+def read(path):
+    with open(path, "r") as file:
+        return file.read()
+
+
+class TestSyncStaticFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "docs")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copies_tree(self):
+        copied = sync_static_files(self.static, self.public)
+        self.assertEqual(2, len(copied))
+        self.assertEqual("png", read(os.path.join(self.public, "images", "a.png")))
+
+    def test_skips_unchanged_files(self):
+        sync_static_files(self.static, self.public)
+        self.assertEqual([], sync_static_files(self.static, self.public))
+
+        write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        copied = sync_static_files(self.static, self.public)
+        self.assertEqual([os.path.join(self.public, "index.css")], copied)
+        self.assertEqual("body { margin: 0 }", read(copied[0]))
+
+    def test_hardlink_strategy(self):
+        sync_static_files(self.static, self.public, strategy="hardlink")
+        source = os.stat(os.path.join(self.static, "index.css"))
+        dest = os.stat(os.path.join(self.public, "index.css"))
+        self.assertEqual(source.st_ino, dest.st_ino)
+
+    def test_recopy_replaces_hardlink(self):
+        sync_static_files(self.static, self.public, strategy="hardlink")
+        manifest = Manifest(os.path.join(self.tmp.name, "manifest.json"))
+        sync_static_files(self.static, self.public, manifest, strategy="copy")
+        source = os.stat(os.path.join(self.static, "index.css"))
+        dest = os.stat(os.path.join(self.public, "index.css"))
+        self.assertNotEqual(source.st_ino, dest.st_ino)
+        self.assertEqual("body {}", read(os.path.join(self.static, "index.css")))
+
+    def test_strategy_change_replaces_fresh_files(self):
+        manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        manifest = Manifest.load(manifest_path)
+        sync_static_files(self.static, self.public, manifest)
+        manifest.save()
+        manifest = Manifest.load(manifest_path)
+        placed = sync_static_files(self.static, self.public, manifest, "hardlink")
+        self.assertEqual(2, len(placed))
+        source = os.stat(os.path.join(self.static, "index.css"))
+        dest = os.stat(os.path.join(self.public, "index.css"))
+        self.assertEqual(source.st_ino, dest.st_ino)
+
+    def test_reflink_strategy_falls_back_to_copy(self):
+        sync_static_files(self.static, self.public, strategy="reflink")
+        self.assertEqual("body {}", read(os.path.join(self.public, "index.css")))
+
+    def test_invalid_strategy(self):
+        with self.assertRaises(ValueError):
+            sync_static_files(self.static, self.public, strategy="symlink")
+
+
+if __name__ == "__main__":
+    unittest.main()
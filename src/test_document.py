@@ -0,0 +1,72 @@
+import unittest
+from unittest import mock
+
+import blocks
+from block_cache import BlockCache
+from blocks import markdown_to_html_node
+from block_lexer import lex_markdown
+from document import PageStream, iter_document_html
+from htmlnode import RenderContext
+
+
+class TestPageStream(unittest.TestCase):
+    def test_title_and_blocks(self):
+        md = "# Title\n\nSome **text**\n\n## Section\n\n- a\n- b"
+        page = PageStream(lex_markdown(md))
+        self.assertEqual("Title", page.title)
+        self.assertEqual(
+            ["# Title", "Some **text**", "## Section", "- a\n- b"],
+            [block.text for block in page.blocks],
+        )
+
+    def test_title_is_first_h1(self):
+        page = PageStream(lex_markdown("## Intro\n\n# Real title\n\n# Second"))
+        self.assertEqual("Real title", page.title)
+        self.assertEqual(3, len(list(page.blocks)))
+
+    def test_no_title(self):
+        page = PageStream(lex_markdown("Just a paragraph"))
+        self.assertIsNone(page.title)
+        self.assertEqual(["Just a paragraph"], [block.text for block in page.blocks])
+
+    def test_lexes_ahead_only_to_the_title(self):
+        lexed = []
+
+        def lex(md):
+            for block in lex_markdown(md):
+                lexed.append(block.text)
+                yield block
+
+        page = PageStream(lex("Intro\n\n# Title\n\nBody"))
+        self.assertEqual(["Intro", "# Title"], lexed)
+        self.assertEqual(["Intro", "# Title", "Body"], [b.text for b in page.blocks])
+
+    def test_iter_html_matches_markdown_to_html_node(self):
+        md = "Intro [link](/a)\n\n```\ncode\n\nmore\n```\n\n# Late title\n\n> q"
+        context = RenderContext("/base/")
+        expected = markdown_to_html_node(md).to_html(context)
+        self.assertEqual(
+            expected, "".join(PageStream(lex_markdown(md)).iter_html(context))
+        )
+        self.assertEqual(
+            expected, "".join(iter_document_html(lex_markdown(md), context))
+        )
+        cache = BlockCache(None)
+        page = PageStream(lex_markdown(md))
+        self.assertEqual(expected, "".join(page.iter_html(context, cache)))
+
+    def test_title_heading_is_built_once(self):
+        for cache in (None, BlockCache(None)):
+            with mock.patch.object(
+                blocks, "text_to_children", wraps=blocks.text_to_children
+            ) as text_to_children:
+                page = PageStream(lex_markdown("# Title\n\nBody"))
+                self.assertEqual(
+                    "<div><h1>Title</h1><p>Body</p></div>",
+                    "".join(page.iter_html(cache=cache)),
+                )
+            self.assertEqual(2, text_to_children.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
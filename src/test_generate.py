@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from block_cache import BlockCache
+import helpers
+from helpers import (chunk_pages, generate_page, generate_pages_recursive,
+                     init_page_worker)
+from linkgraph import SiteIndex
+from profiler import Profiler
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(text)
+
+
+def read_tree(root):
+    files = {}
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            with open(path, "rb") as file:
+                files[os.path.relpath(path, root)] = file.read()
+    return files
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.templates = os.path.join(self.root, "templates")
+        write(
+            os.path.join(self.templates, "template.html"),
+            '<title>{{ Title }}</title><link href="/index.css">{{ Content }}',
+        )
+        for i in range(12):
+            write(
+                os.path.join(self.content, f"page{i}", "index.md"),
+                f"# Page {i}\n\n[home](/) and **bold** ![img](/images/{i}.png)",
+            )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content, self.templates, serial, "/ssg/")
+        generate_pages_recursive(
+            self.content, self.templates, parallel, "/ssg/", jobs=3
+        )
+        self.assertEqual(12, len(read_tree(serial)))
+        self.assertEqual(read_tree(serial), read_tree(parallel))
+
+    def test_parallel_block_cache_collects_worker_renders(self):
+        cache = BlockCache(os.path.join(self.root, "blocks.json"))
+        dest = os.path.join(self.root, "docs")
+        generate_pages_recursive(
+            self.content, self.templates, dest, "/", jobs=3, block_cache=cache
+        )
+        self.assertEqual(24, cache.hits + cache.misses)
+        self.assertEqual(24, len(cache.entries))
+
+    def test_profiled_build_uses_block_cache(self):
+        cache = BlockCache(os.path.join(self.root, "blocks.json"))
+        plain = os.path.join(self.root, "plain")
+        profiled = os.path.join(self.root, "profiled")
+        generate_pages_recursive(
+            self.content, self.templates, plain, "/", block_cache=cache
+        )
+        profiler = Profiler()
+        site = SiteIndex()
+        generate_pages_recursive(
+            self.content,
+            self.templates,
+            profiled,
+            "/",
+            profiler=profiler,
+            block_cache=cache,
+            site=site,
+        )
+        self.assertEqual((24, 24), (cache.hits, cache.misses))
+        self.assertEqual(read_tree(plain), read_tree(profiled))
+        self.assertEqual(12, len(profiler.page_totals()))
+        page = site.pages[os.path.join(profiled, "page0", "index.html")]
+        self.assertEqual(["/images/0.png"], page["images"])
+
+    def test_workers_keep_block_cache_cap(self):
+        cache_path = os.path.join(self.root, "blocks.json")
+        worker_state = dict.fromkeys(
+            [name for name in vars(helpers) if name.startswith("_worker_")]
+        )
+        with mock.patch.multiple(helpers, **worker_state):
+            init_page_worker(None, "/", False, cache_path, 0, 100)
+            self.assertEqual(100, helpers._worker_block_cache.max_bytes)
+
+    def test_parallel_reports_failed_pages(self):
+        write(os.path.join(self.content, "broken", "index.md"), "no title here")
+        dest = os.path.join(self.root, "docs")
+        with self.assertRaises(ValueError) as context:
+            generate_pages_recursive(self.content, self.templates, dest, "/", jobs=2)
+        self.assertIn(os.path.join("broken", "index.md"), str(context.exception))
+        self.assertIn("no title found", str(context.exception))
+        self.assertTrue(os.path.exists(os.path.join(dest, "page0", "index.html")))
+
+    def test_streamed_page_finds_late_title(self):
+        source = os.path.join(self.root, "late.md")
+        write(source, "Intro\n\n# Late\n\n[home](/)")
+        dest = os.path.join(self.root, "docs", "late.html")
+        template = os.path.join(self.templates, "template.html")
+        generate_page(source, template, dest, "/b/")
+        with open(dest) as file:
+            self.assertEqual(
+                '<title>Late</title><link href="/b/index.css"><div><p>Intro</p>'
+                '<h1>Late</h1><p><a href="/b/">home</a></p></div>',
+                file.read(),
+            )
+
+    def test_failed_page_leaves_no_output(self):
+        source = os.path.join(self.root, "bad.md")
+        write(source, "# Title\n\ntext **not closed")
+        dest = os.path.join(self.root, "docs", "bad.html")
+        template = os.path.join(self.templates, "template.html")
+        with self.assertRaises(ValueError):
+            generate_page(source, template, dest, "/")
+        self.assertFalse(os.path.exists(dest))
+
+    def test_chunk_pages(self):
+        pages = list(range(10))
+        batches = chunk_pages(pages, 2)
+        self.assertEqual(pages, [page for batch in batches for page in batch])
+        self.assertTrue(all(len(batch) == 2 for batch in batches))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import images
+from block_cache import block_key
+from block_lexer import lex_markdown
+from htmlnode import LeafNode, RenderContext
+from images import ImageIndex, image_size
+from manifest import Manifest
+
+
+def png(width, height):
+    return (
+        b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+        + struct.pack(">II", width, height)
+        + b"\x08\x06\x00\x00\x00"
+    )
+
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x00" * 10
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+
+def webp(chunk, payload):
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "image")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size_of(self, data):
+        with open(self.path, "wb") as file:
+            file.write(data)
+        return image_size(self.path)
+
+    def test_png(self):
+        self.assertEqual((640, 480), self.size_of(png(640, 480)))
+
+    def test_gif(self):
+        self.assertEqual(
+            (3, 2), self.size_of(b"GIF89a" + struct.pack("<HH", 3, 2) + b"\x00" * 8)
+        )
+
+    def test_jpeg_skips_segments_before_frame(self):
+        self.assertEqual((1024, 768), self.size_of(jpeg(1024, 768)))
+
+    def test_webp_variants(self):
+        lossy = b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 300, 200)
+        self.assertEqual((300, 200), self.size_of(webp(b"VP8 ", lossy)))
+        bits = (300 - 1) | (200 - 1) << 14
+        lossless = b"\x2f" + struct.pack("<I", bits)
+        self.assertEqual((300, 200), self.size_of(webp(b"VP8L", lossless)))
+        size = (299).to_bytes(3, "little") + (199).to_bytes(3, "little")
+        extended = b"\x00" * 4 + size
+        self.assertEqual((300, 200), self.size_of(webp(b"VP8X", extended)))
+
+    def test_unknown_format(self):
+        self.assertIsNone(self.size_of(b"<svg></svg>"))
+
+
+class TestImageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.image = os.path.join(self.static, "images", "a.png")
+        self.write_image(png(40, 30))
+        self.index_path = os.path.join(self.tmp.name, "images.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_image(self, data):
+        with open(self.image, "wb") as file:
+            file.write(data)
+
+    def test_reads_headers_once(self):
+        index = ImageIndex(self.index_path, self.static)
+        self.assertEqual((40, 30), index.size("/images/a.png"))
+        index.save()
+        loaded = ImageIndex.load(self.index_path, self.static)
+        with mock.patch.object(images, "image_size") as image_size:
+            self.assertEqual((40, 30), loaded.size("/images/a.png"))
+        image_size.assert_not_called()
+
+    def test_rereads_changed_file(self):
+        index = ImageIndex(self.index_path, self.static)
+        index.size("/images/a.png")
+        self.write_image(png(400, 300) + b"\x00")
+        self.assertEqual((400, 300), index.size("/images/a.png"))
+
+    def test_ignores_missing_and_external_images(self):
+        index = ImageIndex(self.index_path, self.static)
+        self.assertIsNone(index.size("/images/missing.png"))
+        self.assertIsNone(index.size("https://example.com/a.png"))
+        self.assertIsNone(index.size("images/a.png"))
+
+    def test_render_adds_attributes(self):
+        index = ImageIndex(self.index_path, self.static)
+        context = RenderContext("/base/", images=index)
+        node = LeafNode("img", "", {"src": "/images/a.png", "alt": "A"})
+        self.assertEqual(
+            '<img src="/base/images/a.png" alt="A" width="40" height="30" '
+            'loading="lazy" decoding="async"></img>',
+            node.to_html(context),
+        )
+        external = LeafNode("img", "", {"src": "https://example.com/b.png", "alt": ""})
+        self.assertEqual(
+            '<img src="https://example.com/b.png" alt="" loading="lazy" '
+            'decoding="async"></img>',
+            external.to_html(context),
+        )
+        self.assertNotIn("width", node.to_html(RenderContext("/base/")))
+
+    def test_resizing_invalidates_cached_output(self):
+        context = RenderContext("/", images=ImageIndex(self.index_path, self.static))
+        (block,) = lex_markdown("![a](/images/a.png)")
+        page = os.path.join(self.tmp.name, "page.md")
+        with open(page, "w") as file:
+            file.write(block.text)
+        manifest = Manifest(os.path.join(self.tmp.name, "manifest.json"))
+        first = block_key(block, context), manifest.page_key(page, "", context)
+        self.write_image(png(80, 60) + b"\x00")
+        second = block_key(block, context), manifest.page_key(page, "", context)
+        self.assertNotEqual(first[0], second[0])
+        self.assertNotEqual(first[1], second[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from inline_markdown import split_nodes_delimiter
+from inline_markdown import split_nodes_delimiter, text_to_textnodes
 from textnode import TextNode, TextType
 
 
@@ -84,6 +84,46 @@ class TestInlineMarkdown(unittest.TestCase):
             new_nodes,
         )
 
+    def test_text_to_textnodes_nested_delimiters(self):
+        new_nodes = text_to_textnodes("**snake_case** and _a `tick`_ [x](/y)")
+        self.assertListEqual(
+            [
+                TextNode("snake_case", TextType.BOLD),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("a `tick`", TextType.ITALIC),
+                TextNode(" ", TextType.TEXT),
+                TextNode("x", TextType.LINK, "/y"),
+            ],
+            new_nodes,
+        )
+
+    def test_text_to_textnodes_link_inside_bold(self):
+        new_nodes = text_to_textnodes("**[x](/y)**![](/i.png)")
+        self.assertListEqual(
+            [
+                TextNode("[x](/y)", TextType.BOLD),
+                TextNode("", TextType.IMAGE, "/i.png"),
+            ],
+            new_nodes,
+        )
+
+    def test_text_to_textnodes_empty_sections(self):
+        new_nodes = text_to_textnodes("a****b")
+        self.assertListEqual(
+            [TextNode("a", TextType.TEXT), TextNode("b", TextType.TEXT)], new_nodes
+        )
+
+    def test_text_to_textnodes_unclosed(self):
+        for text in ["**bold", "_a **b** c_", "`a_b`", "`code"]:
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+
+    def test_text_to_textnodes_many_links(self):
+        text = " ".join(f"[l{i}](/{i})" for i in range(2000))
+        new_nodes = text_to_textnodes(text)
+        self.assertEqual(3999, len(new_nodes))
+        self.assertEqual(TextNode("l1999", TextType.LINK, "/1999"), new_nodes[-1])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+
+from helpers import find_pages, generate_pages_recursive
+from manifest import Manifest
+from template import TemplateRegistry
+from test_generate import read_tree, write
+from watch import Watcher
+
+
+class TestTemplateRegistry(unittest.TestCase):
+    def test_expands_includes(self):
+        registry = TemplateRegistry(
+            "templates",
+            {
+                "template": "{{> partials/head }}<main>{{ Content }}</main>",
+                "partials/head": "<title>{{ Title }}</title>",
+            },
+        )
+        self.assertEqual(
+            "<title>T</title><main>C</main>",
+            registry.get("template").render({"Title": "T", "Content": "C"}),
+        )
+        self.assertEqual(
+            os.path.join("templates", "partials/head.html"),
+            registry.paths["partials/head"],
+        )
+
+    def test_include_errors(self):
+        with self.assertRaisesRegex(ValueError, "cycle: a -> b -> a"):
+            TemplateRegistry("", {"a": "{{> b }}", "b": "{{> a }}"})
+        with self.assertRaisesRegex(ValueError, "unknown template include: c"):
+            TemplateRegistry("", {"a": "{{> c }}"})
+        with self.assertRaisesRegex(ValueError, "unknown layout: b"):
+            TemplateRegistry("", {"a": ""}).get("b")
+
+    def test_digest_follows_sources(self):
+        first = TemplateRegistry("", {"a": "{{ Content }}"})
+        second = TemplateRegistry("", {"a": "<p>{{ Content }}</p>"})
+        self.assertNotEqual(first.digest, second.digest)
+        again = TemplateRegistry("", {"a": "{{ Content }}"})
+        self.assertEqual(first.digest, again.digest)
+
+    def test_load_reuses_unchanged_registry(self):
+        with tempfile.TemporaryDirectory() as root:
+            write(os.path.join(root, "template.html"), "<p>{{ Content }}</p>")
+            first = TemplateRegistry.load(root)
+            self.assertIs(first, TemplateRegistry.load(root))
+
+            write(os.path.join(root, "partials", "footer.html"), "<footer>")
+            second = TemplateRegistry.load(root)
+            self.assertIsNot(first, second)
+            self.assertIn("partials/footer", second.templates)
+
+            write(os.path.join(root, "template.html"), "<div>{{ Content }}</div>")
+            os.utime(os.path.join(root, "template.html"), ns=(0, 0))
+            third = TemplateRegistry.load(root)
+            self.assertIsNot(second, third)
+            template = third.get("template")
+            self.assertEqual("<div>x</div>", template.render({"Content": "x"}))
+
+
+class TestLayouts(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.templates = os.path.join(root, "templates")
+        write(os.path.join(self.templates, "template.html"), "{{ Content }}")
+        write(
+            os.path.join(self.templates, "article.html"),
+            "<article>{{ Content }}</article>",
+        )
+        write(os.path.join(self.templates, "blog.html"), "<ul>{{ Content }}</ul>")
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        write(os.path.join(self.content, "blog", "post", "index.md"), "# Post")
+        write(
+            os.path.join(self.content, "blog", "_layout"),
+            "# posts under blog/ are articles\narticle\nindex.md: blog\n",
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_find_pages(self):
+        self.assertEqual(
+            {
+                os.path.join(self.content, "index.md"): "template",
+                os.path.join(self.content, "blog", "index.md"): "blog",
+                os.path.join(self.content, "blog", "post", "index.md"): "article",
+            },
+            dict(find_pages(self.content + os.sep)),
+        )
+
+    def test_pages_render_with_their_layout(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        generate_pages_recursive(self.content, self.templates, serial, "/")
+        generate_pages_recursive(self.content, self.templates, parallel, "/", jobs=2)
+        pages = read_tree(serial)
+        self.assertEqual(pages, read_tree(parallel))
+        self.assertEqual(
+            {
+                "index.html": b"<div><h1>Home</h1></div>",
+                os.path.join("blog", "index.html"): (
+                    b"<ul><div><h1>Blog</h1></div></ul>"
+                ),
+                os.path.join("blog", "post", "index.html"): (
+                    b"<article><div><h1>Post</h1></div></article>"
+                ),
+            },
+            pages,
+        )
+
+    def test_incremental_build_follows_layout_changes(self):
+        dest = os.path.join(self.tmp.name, "docs")
+        manifest_path = os.path.join(self.tmp.name, "manifest.json")
+
+        def build():
+            manifest = Manifest.load(manifest_path)
+            generate_pages_recursive(self.content, self.templates, dest, "/", manifest)
+            manifest.save()
+
+        build()
+        write(os.path.join(self.content, "_layout"), "article")
+        build()
+        with open(os.path.join(dest, "index.html")) as file:
+            self.assertEqual("<article><div><h1>Home</h1></div></article>", file.read())
+
+    def test_unknown_layout(self):
+        write(os.path.join(self.content, "_layout"), "missing")
+        dest = os.path.join(self.tmp.name, "docs")
+        with self.assertRaisesRegex(ValueError, "unknown layout for .*: missing"):
+            generate_pages_recursive(self.content, self.templates, dest, "/")
+
+    def test_watch_rebuilds_pages_under_changed_layout_file(self):
+        public = os.path.join(self.tmp.name, "docs")
+        static = os.path.join(self.tmp.name, "static")
+        os.makedirs(static)
+        watcher = Watcher("/", "copy", self.content, static, self.templates, public)
+        layout_file = os.path.join(self.content, "blog", "_layout")
+        write(layout_file, "template")
+        os.utime(layout_file, ns=(1, 1))
+        pages, _ = watcher.poll()
+        self.assertNotIn(layout_file, pages)
+        with open(os.path.join(public, "blog", "post", "index.html")) as file:
+            self.assertEqual("<div><h1>Post</h1></div>", file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
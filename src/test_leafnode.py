@@ -1,6 +1,6 @@
 import unittest
 
-from htmlnode import LeafNode
+from htmlnode import LeafNode, RenderContext
 
 
 class TestLeafNode(unittest.TestCase):
@@ -34,6 +34,28 @@ class TestLeafNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             htmlnode.to_html()
 
+    def test_context_rewrites_urls(self):
+        context = RenderContext("/ssg/")
+        link = LeafNode("a", "Home", {"href": "/blog/", "class": "/x"})
+        image = LeafNode("img", "", {"src": "/images/a.png", "alt": "/a"})
+        self.assertEqual(
+            '<a href="/ssg/blog/" class="/x">Home</a>', link.to_html(context)
+        )
+        self.assertEqual(
+            '<img src="/ssg/images/a.png" alt="/a"></img>', image.to_html(context)
+        )
+
+    def test_context_keeps_other_urls(self):
+        context = RenderContext("/ssg/")
+        for url in ["https://example.org/", "//cdn.example.org/a.js", "page.html"]:
+            node = LeafNode("a", "x", {"href": url})
+            self.assertEqual(f'<a href="{url}">x</a>', node.to_html(context))
+
+    def test_context_leaves_text_alone(self):
+        node = LeafNode("code", '<a href="/">')
+        context = RenderContext("/ssg/")
+        self.assertEqual('<code><a href="/"></code>', node.to_html(context))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+from block_cache import BlockCache
+from helpers import generate_pages_recursive
+from htmlnode import RenderContext
+from linkgraph import LinkGraph, SiteIndex, page_url, resolve_link, site_urls
+from test_generate import write
+
+
+class TestLinkGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.templates = os.path.join(self.root, "templates")
+        self.public = os.path.join(self.root, "docs")
+        write(os.path.join(self.templates, "template.html"), "{{ Content }}")
+        write(
+            os.path.join(self.content, "index.md"),
+            "# Home\n\n[Blog](/blog) and [gone](/missing)\n\n![logo](/logo.png)",
+        )
+        write(
+            os.path.join(self.content, "blog", "index.md"),
+            "# Blog\n\n[home](/) [out](https://example.com) [top](#top)",
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def generate(self, **kwargs):
+        site = SiteIndex()
+        page_paths = generate_pages_recursive(
+            self.content, self.templates, self.public, "/", site=site, **kwargs
+        )
+        graph = LinkGraph(os.path.join(self.root, "links.json"))
+        graph.update(site, self.public)
+        graph.retain(page_url(path, self.public) for path in page_paths)
+        return graph
+
+    def test_collects_links_and_images(self):
+        graph = self.generate()
+        self.assertEqual(
+            {
+                "title": "Home",
+                "links": ["/blog", "/missing"],
+                "images": ["/logo.png"],
+            },
+            graph.pages["/"],
+        )
+        backlinks = graph.backlinks()
+        self.assertEqual(["/"], backlinks["/blog/"])
+        self.assertEqual(["/blog/"], backlinks["/"])
+
+    def test_backlinks_json(self):
+        graph = self.generate()
+        self.assertEqual(
+            '{"/ssg/":[["/ssg/blog/","Blog"]],'
+            '"/ssg/blog/":[["/ssg/","Home"]],'
+            '"/ssg/missing/":[["/ssg/","Home"]]}',
+            graph.backlinks_json(RenderContext("/ssg/")),
+        )
+
+    def test_block_cache_hits_keep_facts(self):
+        cache = BlockCache(os.path.join(self.root, "blocks.json"))
+        first = self.generate(block_cache=cache)
+        cache.save()
+        second = self.generate(block_cache=cache, jobs=2)
+        self.assertGreater(cache.hits, 0)
+        self.assertEqual(first.pages, second.pages)
+
+    def test_broken_links(self):
+        graph = self.generate()
+        known = site_urls(
+            [os.path.join(self.public, "index.html")]
+            + [os.path.join(self.public, "blog", "index.html")],
+            self.public,
+        )
+        self.assertEqual(
+            [("/", "/missing"), ("/", "/logo.png")], graph.broken_links(known)
+        )
+
+    def test_save_and_load(self):
+        graph = self.generate()
+        graph.save()
+        self.assertEqual(graph.pages, LinkGraph.load(graph.path).pages)
+
+    def test_sitemap(self):
+        graph = self.generate()
+        sitemap = graph.sitemap("https://example.com/", RenderContext("/ssg/"))
+        self.assertIn("<loc>https://example.com/ssg/</loc>", sitemap)
+        self.assertIn("<loc>https://example.com/ssg/blog/</loc>", sitemap)
+
+    def test_resolve_link(self):
+        self.assertEqual("/blog/", resolve_link("/", "/blog"))
+        self.assertEqual("/blog/", resolve_link("/", "/blog/index.html#x"))
+        self.assertEqual("/blog/post/", resolve_link("/blog/", "post"))
+        self.assertEqual("/a.png", resolve_link("/blog/", "../a.png"))
+        self.assertIsNone(resolve_link("/", "https://example.com/"))
+        self.assertIsNone(resolve_link("/", "#top"))
+        self.assertIsNone(resolve_link("/", "mailto:me@example.com"))
+
+    def test_page_url(self):
+        self.assertEqual("/", page_url("docs/index.html", "docs"))
+        self.assertEqual("/blog/", page_url("docs/blog/index.html", "docs"))
+        self.assertEqual("/about.html", page_url("docs/about.html", "docs"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from copystatic import copy_files_recursive
+from helpers import generate_pages_recursive
+import manifest as manifest_module
+from manifest import Manifest, hash_source
+from test_generate import write
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.templates = os.path.join(self.root, "templates")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "docs")
+        self.manifest_path = os.path.join(self.root, ".ssg", "manifest.json")
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        write(
+            os.path.join(self.templates, "template.html"),
+            "<title>{{ Title }}</title>{{ Content }}",
+        )
+        write(os.path.join(self.static, "index.css"), "body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, basepath="/"):
+        manifest = Manifest.load(self.manifest_path)
+        copy_files_recursive(self.static, self.public, manifest)
+        generate_pages_recursive(
+            self.content, self.templates, self.public, basepath, manifest
+        )
+        manifest.prune(self.public)
+        manifest.save()
+
+    def mtime(self, *parts):
+        return os.stat(os.path.join(self.public, *parts)).st_mtime_ns
+
+    def test_skips_unchanged_outputs(self):
+        self.build()
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+        os.utime(os.path.join(self.public, "index.css"), ns=(0, 0))
+        self.build()
+        self.assertEqual(0, self.mtime("index.html"))
+        self.assertEqual(0, self.mtime("index.css"))
+
+    def test_rebuilds_changed_source(self):
+        self.build()
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+        os.utime(os.path.join(self.public, "blog", "index.html"), ns=(0, 0))
+        write(os.path.join(self.content, "index.md"), "# Home again")
+        self.build()
+        self.assertNotEqual(0, self.mtime("index.html"))
+        self.assertEqual(0, self.mtime("blog", "index.html"))
+
+    def test_rebuilds_on_basepath_change(self):
+        write(os.path.join(self.content, "index.md"), "# Home\n\n[home](/)")
+        self.build()
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+        self.build("/ssg/")
+        self.assertNotEqual(0, self.mtime("index.html"))
+
+    def test_removes_orphaned_outputs(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_remove_untracked(self):
+        self.build()
+        write(os.path.join(self.public, "stray", "old.html"), "old")
+        manifest = Manifest.load(self.manifest_path)
+        manifest.outputs = manifest.entries
+        manifest.remove_untracked(self.public)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "stray")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "index.html")))
+
+    def test_hash_source_skips_unmoved_files(self):
+        path = os.path.join(self.content, "index.md")
+        digest = hash_source(path)
+        with mock.patch.object(manifest_module, "hash_file") as hash_file:
+            self.assertEqual(digest, hash_source(path))
+        hash_file.assert_not_called()
+        write(path, "# Home, edited")
+        self.assertNotEqual(digest, hash_source(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from output import OutputWriter, save_changed_list
+
+
+def read(path):
+    with open(path) as file:
+        return file.read()
+
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.path = os.path.join(self.root, "docs", "page", "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_identical_content_keeps_file(self):
+        OutputWriter().write(self.path, "<p>hello</p>")
+        os.utime(self.path, ns=(0, 0))
+        writer = OutputWriter()
+        writer.write(self.path, "<p>hello</p>")
+        self.assertEqual(0, os.stat(self.path).st_mtime_ns)
+        self.assertEqual(([], 1), writer.drain())
+
+    def test_changed_content_replaces_file(self):
+        OutputWriter().write(self.path, "<p>hello</p>")
+        os.utime(self.path, ns=(0, 0))
+        writer = OutputWriter()
+        writer.write(self.path, "<p>hello again</p>")
+        self.assertEqual("<p>hello again</p>", read(self.path))
+        self.assertNotEqual(0, os.stat(self.path).st_mtime_ns)
+        self.assertEqual([self.path], writer.changed)
+
+    def test_failed_write_keeps_previous_file(self):
+        OutputWriter().write(self.path, "<p>old</p>")
+        with self.assertRaises(ValueError):
+            with OutputWriter().open(self.path) as file:
+                file.write("<p>new")
+                raise ValueError("render failed")
+        self.assertEqual("<p>old</p>", read(self.path))
+        self.assertEqual(["index.html"], os.listdir(os.path.dirname(self.path)))
+
+    def test_creates_each_directory_once(self):
+        writer = OutputWriter()
+        directory = os.path.dirname(self.path)
+        with mock.patch("output.os.makedirs", wraps=os.makedirs) as makedirs:
+            writer.write(self.path, "a")
+            writer.write(os.path.join(directory, "other.html"), "b")
+        calls = [call.args[0] for call in makedirs.call_args_list]
+        self.assertEqual(1, calls.count(directory))
+
+    def test_save_changed_list(self):
+        path = os.path.join(self.root, ".ssg", "changed.txt")
+        save_changed_list(path, ["./docs/b.html", "./docs/a.css"])
+        self.assertEqual("./docs/a.css\n./docs/b.html\n", read(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import LeafNode, ParentNode
+from htmlnode import LeafNode, ParentNode, RenderContext
 
 
 class TestParentNode(unittest.TestCase):
@@ -60,6 +61,42 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             parent_node.to_html()
 
+    def test_iter_html(self):
+        node = ParentNode(
+            "div", [ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, "text")])]
+        )
+        self.assertEqual(
+            ["<div>", "<p>", "<b>bold</b>", "text", "</p>", "</div>"],
+            list(node.iter_html()),
+        )
+
+    def test_render_into(self):
+        items = [ParentNode("li", [LeafNode(None, str(i))]) for i in range(3)]
+        node = ParentNode("ul", items)
+        writer = io.StringIO()
+        node.render_into(writer)
+        self.assertEqual(node.to_html(), writer.getvalue())
+        self.assertEqual("<ul><li>0</li><li>1</li><li>2</li></ul>", writer.getvalue())
+
+    def test_iter_html_without_tag(self):
+        node = ParentNode(None, [LeafNode(None, "text")])
+        with self.assertRaises(ValueError):
+            list(node.iter_html())
+
+    def test_minify_keeps_pre_whitespace(self):
+        node = ParentNode(
+            "div",
+            [
+                LeafNode("p", "a  \n b"),
+                ParentNode("pre", [ParentNode("code", [LeafNode(None, "x  \n  y")])]),
+            ],
+        )
+        self.assertEqual(
+            "<div><p>a b</p><pre><code>x  \n  y</code></pre></div>",
+            node.to_html(RenderContext("/", minify=True)),
+        )
+        self.assertIn("a  \n b", node.to_html(RenderContext("/")))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import pipeline
+from helpers import generate_pages_recursive
+from profiler import Profiler
+from template import TemplateRegistry
+from test_generate import read_tree, write
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.templates = os.path.join(self.root, "templates")
+        self.template = os.path.join(self.templates, "template.html")
+        write(self.template, '<title>{{ Title }}</title><a href="/">{{ Content }}')
+        self.pages = []
+        for i in range(10):
+            source = os.path.join(self.content, f"page{i}", "index.md")
+            write(source, f"# Page {i}\n\n[home](/) and **bold**\n\n- a\n- b")
+            dest = os.path.join(self.root, "out", f"page{i}", "index.html")
+            self.pages.append((source, dest, "template"))
+        self.registry = TemplateRegistry.load(self.templates)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_serial_build(self):
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+        generate_pages_recursive(self.content, self.templates, serial, "/ssg/")
+        generate_pages_recursive(
+            self.content, self.templates, pipelined, "/ssg/", in_flight=3
+        )
+        self.assertEqual(10, len(read_tree(pipelined)))
+        self.assertEqual(read_tree(serial), read_tree(pipelined))
+
+    def test_collects_errors_and_keeps_going(self):
+        broken = os.path.join(self.content, "broken.md")
+        write(broken, "no title")
+        broken_dest = os.path.join(self.root, "out", "broken.html")
+        pages = self.pages + [(broken, broken_dest, "template")]
+        errors = pipeline.generate_pages_pipelined(pages, self.registry, "/", 4)
+        self.assertEqual([(broken, "ValueError: no title found")], errors)
+        self.assertEqual(10, len(read_tree(os.path.join(self.root, "out"))))
+
+    def test_profiles_each_page_under_its_source(self):
+        profiler = Profiler()
+        pipeline.generate_pages_pipelined(self.pages, self.registry, "/", 3, profiler)
+        pages = profiler.page_totals()
+        self.assertEqual({source for source, _, _ in self.pages}, set(pages))
+        for page in pages.values():
+            self.assertEqual({"read", "render", "write"}, set(page["stages"]))
+
+    def test_in_flight_limit(self):
+        lock = threading.Lock()
+        current = 0
+        peak = 0
+        read_page = pipeline.read_page
+
+        def slow_read(from_path, profiler=None):
+            nonlocal current, peak
+            with lock:
+                current += 1
+                peak = max(peak, current)
+            time.sleep(0.01)
+            with lock:
+                current -= 1
+            return read_page(from_path, profiler)
+
+        with mock.patch.object(pipeline, "read_page", slow_read):
+            errors = pipeline.generate_pages_pipelined(
+                self.pages, self.registry, "/", in_flight=3
+            )
+        self.assertEqual([], errors)
+        self.assertGreater(peak, 1)
+        self.assertLessEqual(peak, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from profiler import Profiler, profile_stage
+
+
+class TestProfiler(unittest.TestCase):
+    def make_profiler(self):
+        profiler = Profiler()
+        profiler.merge(
+            [
+                {
+                    "name": "parse",
+                    "page": "a.md",
+                    "start": 1.0,
+                    "wall": 0.5,
+                    "cpu": 0.4,
+                    "pid": 1,
+                },
+                {
+                    "name": "write",
+                    "page": "a.md",
+                    "start": 1.5,
+                    "wall": 0.1,
+                    "cpu": 0.0,
+                    "pid": 1,
+                },
+                {
+                    "name": "parse",
+                    "page": "b.md",
+                    "start": 1.0,
+                    "wall": 0.2,
+                    "cpu": 0.2,
+                    "pid": 2,
+                },
+                {
+                    "name": "discovery",
+                    "page": None,
+                    "start": 0.5,
+                    "wall": 0.3,
+                    "cpu": 0.1,
+                    "pid": 1,
+                },
+            ]
+        )
+        return profiler
+
+    def test_stage(self):
+        profiler = Profiler()
+        with profiler.stage("parse", "a.md"):
+            pass
+        self.assertEqual(1, len(profiler.events))
+        self.assertEqual("parse", profiler.events[0]["name"])
+        self.assertEqual("a.md", profiler.events[0]["page"])
+        self.assertGreaterEqual(profiler.events[0]["wall"], 0)
+
+    def test_stage_counts_only_its_own_thread(self):
+        def spin():
+            end = time.perf_counter() + 0.2
+            while time.perf_counter() < end:
+                pass
+
+        profiler = Profiler()
+        worker = threading.Thread(target=spin)
+        with profiler.stage("write", "a.md"):
+            worker.start()
+            worker.join()
+        self.assertGreaterEqual(profiler.events[0]["wall"], 0.2)
+        self.assertLess(profiler.events[0]["cpu"], 0.1)
+
+    def test_profile_stage_without_profiler(self):
+        with profile_stage(None, "parse"):
+            pass
+
+    def test_totals(self):
+        profiler = self.make_profiler()
+        self.assertAlmostEqual(0.7, profiler.stage_totals()["parse"]["wall"])
+        self.assertEqual(
+            ["a.md", "b.md"], [page for page, _ in profiler.slowest_pages()]
+        )
+        self.assertEqual(["a.md"], [page for page, _ in profiler.slowest_pages(1)])
+
+    def test_trace_events(self):
+        trace = self.make_profiler().to_trace_events()
+        events = trace["traceEvents"]
+        self.assertEqual(4, len(events))
+        self.assertEqual("X", events[0]["ph"])
+        self.assertEqual(500000.0, events[0]["ts"])
+        self.assertEqual(500000.0, events[0]["dur"])
+        self.assertEqual(0.0, events[3]["ts"])
+
+    def test_export(self):
+        with tempfile.TemporaryDirectory() as root:
+            prefix = os.path.join(root, "profile")
+            self.make_profiler().export(prefix)
+            with open(prefix + ".json") as file:
+                self.assertIn("a.md", json.load(file)["pages"])
+            with open(prefix + ".trace.json") as file:
+                self.assertIn("traceEvents", json.load(file))
+
+
+if __name__ == "__main__":
+    unittest.main()
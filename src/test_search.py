@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import unittest
+
+from helpers import generate_pages_recursive
+from htmlnode import RenderContext
+from linkgraph import SiteIndex, page_url
+from manifest import Manifest
+from output import OutputWriter
+from search import SearchIndex, page_terms
+from test_generate import write
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.templates = os.path.join(self.root, "templates")
+        self.public = os.path.join(self.root, "docs")
+        self.search_dir = os.path.join(self.public, "search")
+        self.index_path = os.path.join(self.root, "search.json")
+        self.context = RenderContext("/", search=True)
+        write(os.path.join(self.templates, "template.html"), "{{ Content }}")
+        write(
+            os.path.join(self.content, "index.md"),
+            "# Home\n\nWelcome **home**, _reader_.\n\n```\nhidden code\n```",
+        )
+        write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nWelcome back")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self):
+        site = SiteIndex()
+        page_paths = generate_pages_recursive(
+            self.content, self.templates, self.public, self.context, site=site
+        )
+        index = SearchIndex.load(self.index_path)
+        index.update(site, self.public)
+        index.retain(page_url(path, self.public) for path in page_paths)
+        writer = OutputWriter()
+        manifest = Manifest(os.path.join(self.root, "manifest.json"))
+        index.write(self.search_dir, writer, manifest, self.context)
+        index.save()
+        return index, writer.changed, manifest
+
+    def read_shard(self, prefix):
+        with open(os.path.join(self.search_dir, f"{prefix}.json")) as file:
+            return json.load(file)
+
+    def test_writes_sharded_postings(self):
+        index, _, _ = self.build()
+        home = index.pages["/"]["id"]
+        blog = index.pages["/blog/"]["id"]
+        self.assertEqual(
+            {"welcome": sorted([[home, 1], [blog, 1]])}, self.read_shard("we")
+        )
+        self.assertEqual([[home, 1]], self.read_shard("re")["reader"])
+        self.assertEqual(2 + 5, index.pages["/"]["terms"]["home"])
+        self.assertFalse(os.path.exists(os.path.join(self.search_dir, "hi.json")))
+        with open(os.path.join(self.search_dir, "pages.json")) as file:
+            self.assertIn([home, "/", "Home"], json.load(file))
+
+    def test_rewrites_only_changed_shards(self):
+        self.build()
+        write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nWelcome zebra")
+        _, changed, manifest = self.build()
+        self.assertEqual([os.path.join(self.search_dir, "ze.json")], changed)
+        self.assertNotIn(os.path.join(self.search_dir, "ba.json"), manifest.outputs)
+
+    def test_removed_page_leaves_index(self):
+        first, _, _ = self.build()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        second, _, _ = self.build()
+        self.assertEqual(["/"], list(second.pages))
+        self.assertNotIn("bl", second.shards)
+        home = first.pages["/"]["id"]
+        self.assertEqual([[home, 1]], self.read_shard("we")["welcome"])
+
+    def test_load_restores_shards(self):
+        index, _, _ = self.build()
+        loaded = SearchIndex.load(self.index_path)
+        self.assertEqual(index.shards, loaded.shards)
+        self.assertEqual(set(), loaded.dirty)
+
+    def test_page_terms_weights_title(self):
+        facts = {"title": "Big News", "terms": ["big", "news", "news", "today"]}
+        self.assertEqual({"big": 6, "news": 7, "today": 1}, page_terms(facts))
+
+
+if __name__ == "__main__":
+    unittest.main()
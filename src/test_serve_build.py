@@ -0,0 +1,71 @@
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import serve_build
+from build_client import request_build
+from serve_build import handle_request
+
+
+class TestServeBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp.name, "build.sock")
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen()
+        self.warm = {}
+
+    def tearDown(self):
+        self.server.close()
+        self.tmp.cleanup()
+
+    def request(self, argv):
+        def serve_one():
+            connection, _ = self.server.accept()
+            with connection:
+                handle_request(connection, self.warm)
+
+        thread = threading.Thread(target=serve_one)
+        thread.start()
+        output = io.StringIO()
+        status = request_build(argv, self.socket_path, output)
+        thread.join()
+        return status, output.getvalue()
+
+    def test_streams_output_and_keeps_state_warm(self):
+        def run_build(args, warm):
+            warm["builds"] = warm.get("builds", 0) + 1
+            print(f"built {args.basepath} #{warm['builds']}")
+
+        with mock.patch.object(serve_build, "run_build", run_build):
+            self.assertEqual((0, "built /ssg/ #1\n"), self.request(["/ssg/"]))
+            self.assertEqual((0, "built /ssg/ #2\n"), self.request(["/ssg/"]))
+
+    def test_build_errors_set_status(self):
+        def run_build(args, warm):
+            raise ValueError("failed to generate 1 page(s)")
+
+        with mock.patch.object(serve_build, "run_build", run_build):
+            status, output = self.request(["/"])
+        self.assertEqual(1, status)
+        self.assertIn("ValueError: failed to generate 1 page(s)", output)
+
+    def test_rejects_invalid_requests(self):
+        self.assertEqual(1, self.request([])[0])
+        self.assertEqual(1, self.request(["/", "--watch"])[0])
+        status, output = self.request(["/", "--bogus"])
+        self.assertEqual(2, status)
+        self.assertIn("unrecognized arguments: --bogus", output)
+
+    def test_no_daemon(self):
+        missing = os.path.join(self.tmp.name, "missing.sock")
+        self.assertIsNone(request_build(["/"], missing))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import statefile
+from manifest import Manifest
+from statefile import load_state, save_state
+
+
+class TestStateFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, ".ssg", "state.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        save_state(self.path, {"version": 1, "entries": {"a": 1}})
+        self.assertEqual({"version": 1, "entries": {"a": 1}}, load_state(self.path, 1))
+        self.assertEqual(["state.json"], os.listdir(os.path.dirname(self.path)))
+
+    def test_untrusted_state_loads_as_none(self):
+        self.assertIsNone(load_state(self.path, 1))
+        save_state(self.path, {"version": 1})
+        self.assertIsNone(load_state(self.path, 2))
+        with open(self.path, "w") as file:
+            file.write('{"version": 1, "entr')
+        self.assertIsNone(load_state(self.path, 1))
+        with open(self.path, "w") as file:
+            file.write("[1]")
+        self.assertIsNone(load_state(self.path, 1))
+
+    def test_interrupted_save_keeps_previous_state(self):
+        save_state(self.path, {"version": 1, "entries": {"a": 1}})
+
+        def interrupted(data, file, **kwargs):
+            file.write('{"version": 1, "entr')
+            raise KeyboardInterrupt
+
+        with mock.patch.object(statefile.json, "dump", interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                save_state(self.path, {"version": 1, "entries": {"b": 2}})
+        with open(self.path) as file:
+            self.assertEqual({"version": 1, "entries": {"a": 1}}, json.load(file))
+        self.assertEqual(["state.json"], os.listdir(os.path.dirname(self.path)))
+
+    def test_truncated_manifest_is_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as file:
+            file.write("")
+        self.assertEqual({}, Manifest.load(self.path).entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
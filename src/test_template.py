@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+
+from htmlnode import RenderContext
+from template import compile_template, load_template, minify_html
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_segments(self):
+        template = compile_template(
+            '<title>{{ Title }}</title><link href="/index.css">{{ Content }}'
+        )
+        self.assertEqual(
+            [
+                "<title>",
+                "{{ Title }}",
+                '</title><link href="',
+                "/index.css",
+                '">',
+                "{{ Content }}",
+            ],
+            template.parts,
+        )
+        self.assertEqual([(1, "Title"), (3, "url"), (5, "Content")], template.slots)
+        self.assertEqual(["/index.css"], template.urls())
+
+    def test_render(self):
+        template = compile_template(
+            '<title>{{ Title }}</title><img src="/a.png">{{ Content }}'
+        )
+        html = template.render(
+            {"Title": "Hi", "Content": "<p>x</p>", "url": RenderContext("/ssg/").url}
+        )
+        self.assertEqual('<title>Hi</title><img src="/ssg/a.png"><p>x</p>', html)
+
+    def test_protocol_relative_urls_are_not_slots(self):
+        template = compile_template('<script src="//cdn.example.com/a.js"></script>')
+        self.assertEqual([], template.slots)
+
+    def test_render_keeps_unknown_placeholders(self):
+        template = compile_template("{{ Title }} {{ Unknown }}")
+        self.assertEqual("Hi {{ Unknown }}", template.render({"Title": "Hi"}))
+
+    def test_render_does_not_mutate_template(self):
+        template = compile_template("<b>{{ Title }}</b>")
+        template.render({"Title": "one"})
+        self.assertEqual("<b>two</b>", template.render({"Title": "two"}))
+
+    def test_render_into_streams_chunks(self):
+        template = compile_template('<a href="/">{{ Title }}</a>{{ Content }}')
+        values = {"Title": "Hi", "Content": iter(["<p>", "x", "</p>"])}
+        writer = io.StringIO()
+        template.render_into(writer, values)
+        self.assertEqual('<a href="/">Hi</a><p>x</p>', writer.getvalue())
+
+    def test_load_template_cache(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as file:
+                file.write("<p>{{ Content }}</p>")
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+
+            with open(path, "w") as file:
+                file.write("<div>{{ Content }}</div>")
+            os.utime(path, ns=(0, 0))
+            second = load_template(path)
+            self.assertIsNot(first, second)
+            self.assertEqual("<div>x</div>", second.render({"Content": "x"}))
+
+    def test_minify_html(self):
+        self.assertEqual(
+            '<html><head><title>{{ Title }}</title></head><body><p>a <b>b</b> c</p>'
+            "<pre>\n  keep\n</pre></body></html>",
+            minify_html(
+                "<html>\n<head>\n  <title>{{ Title }}</title>\n</head>\n<body>\n"
+                "  <p>a\n  <b>b</b>   c</p>\n<pre>\n  keep\n</pre>\n</body>\n</html>\n"
+            ),
+        )
+
+    def test_compile_minified(self):
+        template = compile_template("<p>\n  {{ Content }}\n</p>\n", minify=True)
+        self.assertEqual("<p>x</p>", template.render({"Content": "x"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
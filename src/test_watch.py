@@ -0,0 +1,143 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from assets import AssetManifest
+from htmlnode import RenderContext
+from images import ImageIndex
+from test_generate import write
+from test_images import png
+from watch import Watcher, diff_snapshots
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.templates = os.path.join(root, "templates")
+        self.public = os.path.join(root, "docs")
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        write(os.path.join(self.templates, "template.html"), "{{ Content }}")
+        self.watcher = Watcher(
+            "/", "copy", self.content, self.static, self.templates, self.public
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def touch(self, path, text):
+        write(path, text)
+        os.utime(path, ns=(1, 1))
+
+    def test_no_changes(self):
+        self.assertEqual(([], []), self.watcher.poll())
+
+    def test_changed_page_rebuilds_one_page(self):
+        page = os.path.join(self.content, "index.md")
+        self.touch(page, "# Home again")
+        self.assertEqual(([page], []), self.watcher.poll())
+        with open(os.path.join(self.public, "index.html")) as file:
+            self.assertEqual("<div><h1>Home again</h1></div>", file.read())
+
+    def test_changed_template_rebuilds_pages_only(self):
+        template = os.path.join(self.templates, "template.html")
+        self.touch(template, "<main>{{ Content }}</main>")
+        pages, assets = self.watcher.poll()
+        self.assertEqual(2, len(pages))
+        self.assertEqual([], assets)
+
+    def test_changed_static_file(self):
+        css = os.path.join(self.static, "index.css")
+        self.touch(css, "body { margin: 0 }")
+        self.assertEqual(([], [css]), self.watcher.poll())
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css")))
+
+    def test_removed_page_removes_output(self):
+        page = os.path.join(self.content, "blog", "index.md")
+        self.touch(page, "# Blog")
+        self.watcher.poll()
+        os.remove(page)
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+
+    def test_changed_image_rerenders_pages_showing_it(self):
+        image = os.path.join(self.static, "a.png")
+        self.touch(image, "")
+        with open(image, "wb") as file:
+            file.write(png(1, 1))
+        page = os.path.join(self.content, "index.md")
+        write(page, "# Home\n\n![a](/a.png)")
+        images = ImageIndex(os.path.join(self.tmp.name, "images.json"), self.static)
+        context = RenderContext("/", images=images)
+        watcher = Watcher(
+            context, "copy", self.content, self.static, self.templates, self.public
+        )
+        with open(image, "wb") as file:
+            file.write(png(3, 2))
+        os.utime(image, ns=(2, 2))
+        self.assertEqual(([page], [image]), watcher.poll())
+        with open(os.path.join(self.public, "index.html")) as file:
+            self.assertIn('width="3" height="2"', file.read())
+
+    def test_changed_asset_is_fingerprinted_again(self):
+        write(
+            os.path.join(self.templates, "template.html"),
+            '<link href="/index.css">{{ Content }}',
+        )
+        old_path = os.path.join(self.public, "index.0123456789.css")
+        write(old_path, "body {}")
+        assets_path = os.path.join(self.tmp.name, "assets.json")
+        assets = AssetManifest(assets_path, {"/index.css": "/index.0123456789.css"})
+        context = RenderContext("/", assets=assets)
+        watcher = Watcher(
+            context, "copy", self.content, self.static, self.templates, self.public
+        )
+        self.touch(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        pages, _ = watcher.poll()
+        self.assertEqual(2, len(pages))
+        fingerprinted = assets.assets["/index.css"]
+        self.assertRegex(fingerprinted, r"^/index\.[0-9a-f]{10}\.css$")
+        self.assertNotEqual("/index.0123456789.css", fingerprinted)
+        self.assertFalse(os.path.exists(old_path))
+        with open(os.path.join(self.public, fingerprinted[1:])) as file:
+            self.assertEqual("body { margin: 0 }", file.read())
+        with open(os.path.join(self.public, "index.html")) as file:
+            self.assertIn(f'href="{fingerprinted}"', file.read())
+        saved = AssetManifest.load(assets_path)
+        self.assertEqual(fingerprinted, saved.assets["/index.css"])
+        self.assertTrue(os.path.exists(os.path.join(self.public, "_headers")))
+
+    def test_compress_refreshes_sidecars(self):
+        watcher = Watcher(
+            "/",
+            "copy",
+            self.content,
+            self.static,
+            self.templates,
+            self.public,
+            compress=True,
+            compress_min_size=0,
+        )
+        page = os.path.join(self.content, "index.md")
+        self.touch(page, "# Home again")
+        watcher.poll()
+        sidecar = os.path.join(self.public, "index.html.gz")
+        with gzip.open(sidecar, "rt") as file:
+            self.assertEqual("<div><h1>Home again</h1></div>", file.read())
+        os.remove(page)
+        watcher.poll()
+        self.assertFalse(os.path.exists(sidecar))
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1)}
+        new = {"a": (2, 1), "c": (1, 1)}
+        self.assertEqual((["a", "c"], ["b"]), diff_snapshots(old, new))
+
+
+if __name__ == "__main__":
+    unittest.main()
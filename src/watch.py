@@ -0,0 +1,260 @@
+import os
+import time
+
+from assets import fingerprint_static_file, remove_asset
+from build import (dir_path_content, dir_path_public, dir_path_static,
+                   dir_path_templates)
+from compress import DEFAULT_MIN_SIZE, refresh_sidecars
+from copystatic import place_file
+from helpers import LAYOUT_FILE, find_pages, generate_page, page_dest_path
+from htmlnode import RenderContext
+from inline_markdown import extract_markdown_images, extract_markdown_links
+from manifest import remove_empty_dirs
+from output import OutputWriter
+from template import TemplateRegistry
+
+
+def take_snapshot(dir_paths):
+    snapshot = {}
+    for dir_path in dir_paths:
+        if os.path.isdir(dir_path):
+            scan_tree(dir_path, snapshot)
+    return snapshot
+
+
+def scan_tree(dir_path, snapshot):
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                scan_tree(entry.path, snapshot)
+            else:
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+
+def diff_snapshots(old, new):
+    changed = [path for path, stat in new.items() if old.get(path) != stat]
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+
+def is_inside(path, dir_path):
+    return path.startswith(dir_path + os.sep)
+
+
+def root_relative_path(value):
+    # "/images/a.png?v=2#top" -> "/images/a.png"; None unless root-relative.
+    if not value.startswith("/") or value.startswith("//"):
+        return None
+    return value.split("?", 1)[0].split("#", 1)[0]
+
+
+def static_references(markdown, context):
+    # The static URLs a page's HTML depends on: the images it sizes, and with
+    # fingerprinting every URL it links to.
+    urls = []
+    if context.images is not None or context.assets is not None:
+        urls += [src for _, src in extract_markdown_images(markdown)]
+    if context.assets is not None:
+        urls += [href for _, href in extract_markdown_links(markdown)]
+    return {url for value in urls if (url := root_relative_path(value)) is not None}
+
+
+class Watcher:
+    def __init__(
+        self,
+        context,
+        static_strategy="copy",
+        content=dir_path_content,
+        static=dir_path_static,
+        templates=dir_path_templates,
+        public=dir_path_public,
+        compress=False,
+        compress_min_size=DEFAULT_MIN_SIZE,
+    ) -> None:
+        self.context = RenderContext.of(context)
+        self.static_strategy = static_strategy
+        self.content = content
+        self.static = static
+        self.templates = templates
+        self.public = public
+        self.compress = compress
+        self.compress_min_size = compress_min_size
+        self.snapshot = take_snapshot([content, static, templates])
+        # page source -> static URLs it references; static URLs in templates
+        self.references = {}
+        self.template_urls = set()
+        if self.context.images is not None or self.context.assets is not None:
+            for path in self.snapshot:
+                if self.is_page(path):
+                    self.update_references(path)
+        if self.context.assets is not None:
+            self.update_template_urls()
+        self.dependencies = self.dependency_map()
+
+    def is_page(self, path):
+        return is_inside(path, self.content) and os.path.basename(path) != LAYOUT_FILE
+
+    def update_references(self, source):
+        try:
+            with open(source, "r") as file:
+                self.references[source] = static_references(file.read(), self.context)
+        except (OSError, UnicodeDecodeError):
+            self.references.pop(source, None)
+
+    def update_template_urls(self):
+        try:
+            templates = TemplateRegistry.load(self.templates, self.context.minify)
+        except (OSError, ValueError):
+            return
+        self.template_urls = {
+            url
+            for template in templates.templates.values()
+            for value in template.urls()
+            if (url := root_relative_path(value)) is not None
+        }
+
+    def dependency_map(self):
+        # source file -> the outputs it feeds, as ("page" | "static", source) pairs
+        pages = [path for path in self.snapshot if self.is_page(path)]
+        users = {}
+        for page in pages:
+            for url in self.references.get(page, ()):
+                users.setdefault(url, []).append(page)
+        dependencies = {}
+        for path in self.snapshot:
+            if self.is_page(path):
+                dependencies[path] = [("page", path)]
+            elif is_inside(path, self.static):
+                # Pages embed image sizes and fingerprinted names from static/.
+                url = self.static_url(path)
+                if url in self.template_urls:
+                    readers = pages
+                else:
+                    readers = users.get(url, [])
+                dependencies[path] = [("static", path)]
+                dependencies[path] += [("page", page) for page in readers]
+            else:
+                dependencies[path] = [("page", page) for page in pages]
+        return dependencies
+
+    def output_path(self, kind, source):
+        if kind == "page":
+            return page_dest_path(source, self.content, self.public)
+        return os.path.join(self.public, os.path.relpath(source, self.static))
+
+    def static_url(self, source):
+        return "/" + os.path.relpath(source, self.static).replace(os.sep, "/")
+
+    def poll(self):
+        snapshot = take_snapshot([self.content, self.static, self.templates])
+        changed, removed = diff_snapshots(self.snapshot, snapshot)
+        if not changed and not removed:
+            return [], []
+        old_dependencies = self.dependencies
+        self.snapshot = snapshot
+        if self.context.images is not None or self.context.assets is not None:
+            for path in removed:
+                self.references.pop(path, None)
+            for path in changed:
+                if self.is_page(path):
+                    self.update_references(path)
+        if self.context.assets is not None and any(
+            is_inside(path, self.templates) for path in changed + removed
+        ):
+            self.update_template_urls()
+        self.dependencies = self.dependency_map()
+
+        start = time.perf_counter()
+        pages = set()
+        assets = set()
+        for path in removed:
+            for kind, source in old_dependencies.get(path, []):
+                if source == path:
+                    self.remove_output(kind, source)
+                elif source in snapshot:
+                    # A removed template or _layout file changes its pages.
+                    pages.add(source)
+
+        for path in changed:
+            for kind, source in self.dependencies[path]:
+                (pages if kind == "page" else assets).add(source)
+        written = []
+        for source in sorted(assets):
+            dest_path = self.output_path("static", source)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            place_file(source, dest_path, self.static_strategy)
+            written.append(dest_path)
+            if self.context.assets is not None:
+                written.append(
+                    fingerprint_static_file(
+                        source,
+                        os.path.dirname(dest_path),
+                        self.static_url(source),
+                        self.context.assets,
+                        self.static_strategy,
+                    )
+                )
+        if self.context.assets is not None and (
+            assets or any(is_inside(path, self.static) for path in removed)
+        ):
+            self.context.assets.save()
+            headers_path = os.path.join(self.public, "_headers")
+            headers = self.context.assets.headers(self.context)
+            OutputWriter().write(headers_path, headers)
+        writer = OutputWriter()
+        if pages:
+            try:
+                templates = TemplateRegistry.load(self.templates, self.context.minify)
+            except (OSError, ValueError) as e:
+                print(f"Error: {self.templates}: {e}")
+                pages = set()
+            layouts = dict(find_pages(self.content))
+        for source in sorted(pages):
+            try:
+                layout = layouts[source]
+                generate_page(
+                    source,
+                    templates.paths.get(layout),
+                    self.output_path("page", source),
+                    self.context,
+                    writer=writer,
+                    template=templates.get(layout),
+                )
+            except (OSError, ValueError) as e:
+                print(f"Error: {source}: {e}")
+        if self.compress:
+            for dest_path in written + writer.changed:
+                refresh_sidecars(dest_path, self.compress_min_size)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"Rebuilt {len(pages)} pages and {len(assets)} static files"
+            f" in {elapsed:.1f} ms"
+        )
+        return sorted(pages), sorted(assets)
+
+    def remove_output(self, kind, source):
+        dest_path = self.output_path(kind, source)
+        if kind == "static" and self.context.assets is not None:
+            url = self.static_url(source)
+            fingerprinted = self.context.assets.assets.pop(url, None)
+            if fingerprinted is not None:
+                fingerprinted_path = os.path.join(self.public, fingerprinted[1:])
+                remove_asset(fingerprinted_path)
+                if self.compress:
+                    refresh_sidecars(fingerprinted_path, self.compress_min_size)
+        if os.path.exists(dest_path):
+            print(f" - removing {dest_path}")
+            os.remove(dest_path)
+            if self.compress:
+                refresh_sidecars(dest_path, self.compress_min_size)
+            remove_empty_dirs(os.path.dirname(dest_path), self.public)
+
+    def run(self, interval):
+        print(f"Watching {self.content}, {self.static} and {self.templates}...")
+        try:
+            while True:
+                self.poll()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("Stopped watching.")